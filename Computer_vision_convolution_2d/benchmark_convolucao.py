@@ -0,0 +1,113 @@
+# Compara os métodos de convolução (direto, separável e FFT) para vários
+# tamanhos de imagem e de núcleo e mostra onde cada um vence
+# Exemplo de uso:
+# $ python benchmark_convolucao.py --imagens 256,1024 --nucleos 3,7,15,31
+#
+# Com --arquivos, mostra para cada arquivo de núcleo se ele é separável e
+# quanto a convolução em duas passadas 1D ganha sobre a 2D direta:
+# $ python benchmark_convolucao.py --arquivos mh.txt mv.txt ms.txt nucleo.txt --imagem buga_cinza.jpg
+
+import time
+from argparse import ArgumentParser
+
+import numpy as np
+
+from convolucao import convolver, escolher_metodo, fatorar_nucleo, validar_nucleo, ler_nucleo
+
+METODOS_TESTADOS = ('direto', 'separavel', 'fft')
+
+def medir(imagem, nucleo, fatores, metodo, repeticoes):
+    saida = np.zeros(imagem.shape, dtype=np.float32)
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        convolver(imagem, nucleo, 'refletir', saida, metodo, fatores)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+# Ganho da convolução separável sobre a direta para um núcleo. Um núcleo
+# não separável não é medido: não há duas passadas com que comparar
+def comparar_separavel(imagem, nucleo, repeticoes=3):
+    nucleo = validar_nucleo(nucleo)
+    singulares = np.linalg.svd(nucleo, compute_uv=False)
+    fatores = fatorar_nucleo(nucleo)
+    relatorio = {
+        'nucleo': f'{nucleo.shape[0]}x{nucleo.shape[1]}',
+        'separavel': fatores is not None,
+        'razao_singulares': singulares[1] / singulares[0] if len(singulares) > 1 and singulares[0] else 0.0,
+        'direto': None,
+        'separado': None,
+        'ganho': None,
+    }
+    if fatores is not None:
+        relatorio['direto'] = medir(imagem, nucleo, None, 'direto', repeticoes)
+        relatorio['separado'] = medir(imagem, nucleo, fatores, 'separavel', repeticoes)
+        relatorio['ganho'] = relatorio['direto'] / relatorio['separado']
+    return relatorio
+
+def descrever_ganho(relatorio):
+    if not relatorio['separavel']:
+        return (f"{relatorio['nucleo']} não separável (σ2/σ1 = {relatorio['razao_singulares']:.2g}): "
+                f"sem ganho das duas passadas 1D")
+    return (f"{relatorio['nucleo']} separável: direto {relatorio['direto'] * 1000:.2f} ms, "
+            f"duas passadas 1D {relatorio['separado'] * 1000:.2f} ms ({relatorio['ganho']:.1f}x)")
+
+def executar_benchmark(tamanhos_imagem, tamanhos_nucleo, repeticoes=3, semente=42):
+    gerador = np.random.default_rng(semente)
+    linhas = []
+    for lado in tamanhos_imagem:
+        imagem = gerador.integers(0, 256, (lado, lado)).astype(np.uint8)
+        for k in tamanhos_nucleo:
+            # Núcleo separável (produto externo), para que os três métodos
+            # calculem a mesma coisa
+            coluna, linha = gerador.random(k), gerador.random(k)
+            nucleo = np.outer(coluna, linha)
+            tempos = {metodo: medir(imagem, nucleo, (coluna, linha), metodo, repeticoes)
+                      for metodo in METODOS_TESTADOS}
+            linhas.append({
+                'imagem': lado,
+                'nucleo': k,
+                'tempos': tempos,
+                'vencedor': min(tempos, key=tempos.get),
+                'escolhido': escolher_metodo(lado, lado, k, k, separavel=True),
+                'escolhido_nao_separavel': escolher_metodo(lado, lado, k, k),
+            })
+    return linhas
+
+def imprimir_tabela(linhas):
+    print('| imagem | núcleo | direto (ms) | separável (ms) | FFT (ms) | vencedor | auto | auto (não separável) |')
+    print('|---|---|---|---|---|---|---|---|')
+    for l in linhas:
+        t = l['tempos']
+        print(f"| {l['imagem']}x{l['imagem']} | {l['nucleo']}x{l['nucleo']} "
+              f"| {t['direto'] * 1000:.2f} | {t['separavel'] * 1000:.2f} | {t['fft'] * 1000:.2f} "
+              f"| {l['vencedor']} | {l['escolhido']} | {l['escolhido_nao_separavel']} |")
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='Benchmark dos métodos de convolução')
+    parser.add_argument('--imagens', default='256,512,1024',
+                        help='Lados das imagens quadradas, separados por vírgula')
+    parser.add_argument('--nucleos', default='3,5,7,11,15,31',
+                        help='Lados dos núcleos (ímpares), separados por vírgula')
+    parser.add_argument('--repeticoes', type=int, default=3,
+                        help='Repetições de cada medida (vale o menor tempo)')
+    parser.add_argument('--arquivos', nargs='+',
+                        help='Arquivos de núcleo para o relatório de separabilidade')
+    parser.add_argument('--imagem', default='buga_cinza.jpg',
+                        help='Imagem usada no relatório de separabilidade')
+    args = parser.parse_args()
+
+    if args.arquivos:
+        import cv2
+        imagem = cv2.imread(args.imagem, cv2.IMREAD_GRAYSCALE)
+        if imagem is None:
+            parser.error(f'imagem não pode ser carregada: {args.imagem}')
+        for caminho in args.arquivos:
+            print(f'{caminho}: {descrever_ganho(comparar_separavel(imagem, ler_nucleo(caminho), args.repeticoes))}')
+        raise SystemExit
+
+    imprimir_tabela(executar_benchmark(
+        [int(lado) for lado in args.imagens.split(',')],
+        [int(k) for k in args.nucleos.split(',')],
+        args.repeticoes,
+    ))
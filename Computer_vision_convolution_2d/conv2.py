@@ -1,8 +1,14 @@
+import os
+import threading
 import cv2
 import numpy as np
 import tkinter as tk
 from tkinter import filedialog, messagebox
 from PIL import Image, ImageTk
+from convolucao import ler_nucleo, MODOS_BORDA, METODOS
+from ladrilhos import convolver_ladrilhos, MODOS_COR
+from benchmark_convolucao import comparar_separavel, descrever_ganho
+from historico import HistoricoConvolucao
 
 def criar_interface():
     global imagem, imagem_tk, canvas_original, canvas_convolucao, imagem_original
@@ -17,23 +23,46 @@ def criar_interface():
     canvas_convolucao = tk.Canvas(janela, bg='#ffffff', highlightthickness=1, highlightbackground='#d3d3d3')
     canvas_convolucao.grid(row=0, column=1, rowspan=4, padx=20, pady=20)
 
+    # Os núcleos aplicados formam uma cadeia no histórico: a cadeia é
+    # fundida em um único núcleo e aplicada em uma passada sobre a imagem
+    # original, e as imagens já calculadas ficam em cache
     def processar_valores(nucleo=None):
         if nucleo is None:
             nucleo = [[float(entry.get()) for entry in entradas[i:i+3]] for i in range(0, len(entradas), 3)]
-        imagem_convolucao = aplicar_convolucao(nucleo)
+        try:
+            imagem_convolucao = historico.aplicar(nucleo, borda.get(), metodo.get(), canais_escolhidos())
+        except ValueError as e:
+            messagebox.showerror("Erro", str(e))
+            return
         global imagem
         imagem = imagem_convolucao
         atualizar_imagem()
 
+    def desfazer():
+        global imagem
+        imagem = historico.desfazer(borda.get(), metodo.get(), canais_escolhidos())
+        atualizar_imagem()
+
+    def refazer():
+        global imagem
+        imagem = historico.refazer(borda.get(), metodo.get(), canais_escolhidos())
+        atualizar_imagem()
+
+    # Em imagens coloridas, 'luminancia' convolve só o Y do YCbCr
+    def canais_escolhidos():
+        return MODOS_COR[cor.get()][1] if imagem_original.ndim == 3 else 'todos'
+
+    # A imagem é carregada em cinza ou colorida (BGR) conforme o modo de cor
     def selecionar_imagem():
-        global imagem, imagem_original
+        global imagem, imagem_original, historico
         caminho_imagem = filedialog.askopenfilename(filetypes=[("Arquivos de Imagem", "*.jpg;*.png;*.bmp")])
         if caminho_imagem:
-            imagem_original = cv2.imread(caminho_imagem, cv2.IMREAD_GRAYSCALE)
-            imagem = imagem_original.copy()
+            imagem_original = cv2.imread(caminho_imagem, MODOS_COR[cor.get()][0])
+            imagem = imagem_original
             if imagem is None:
                 messagebox.showerror("Erro", "Imagem não pode ser carregada.")
             else:
+                historico = HistoricoConvolucao(imagem_original)
                 messagebox.showinfo("Sucesso", "Imagem carregada com sucesso.")
                 atualizar_imagem()
         else:
@@ -41,36 +70,68 @@ def criar_interface():
 
     def atualizar_imagem():
         global imagem, imagem_tk, imagem_original_tk
-        altura, largura = imagem.shape
+        altura, largura = imagem.shape[:2]
 
         canvas_original.config(width=largura, height=altura)
         canvas_convolucao.config(width=largura, height=altura)
 
-        imagem_tk = ImageTk.PhotoImage(image=Image.fromarray(imagem))
+        imagem_tk = ImageTk.PhotoImage(image=Image.fromarray(para_exibir(imagem)))
         canvas_convolucao.create_image(largura // 2, altura // 2, anchor=tk.CENTER, image=imagem_tk)
 
-        imagem_original_tk = ImageTk.PhotoImage(image=Image.fromarray(imagem_original))
+        imagem_original_tk = ImageTk.PhotoImage(image=Image.fromarray(para_exibir(imagem_original)))
         canvas_original.create_image(largura // 2, altura // 2, anchor=tk.CENTER, image=imagem_original_tk)
 
+    # O reset também entra no histórico (pode ser desfeito)
     def reset_imagem():
-        global imagem, imagem_original
-        imagem = imagem_original.copy()
+        global imagem
+        imagem = historico.resetar()
         atualizar_imagem()
 
     def carregar_nucleo():
         try:
             caminho_arquivo = filedialog.askopenfilename(filetypes=[("Arquivos de Texto", "*.txt")], title="Selecione o arquivo de núcleo")
             if caminho_arquivo:
-                with open(caminho_arquivo, 'r') as arquivo:
-                    nucleo_str = arquivo.read().strip()
-                    nucleo = [float(valor) for valor in nucleo_str.split()]
-                    nucleo = [nucleo[i:i+3] for i in range(0, len(nucleo), 3)]
-                    processar_valores(nucleo)
+                try:
+                    nucleo = ler_nucleo(caminho_arquivo)
+                except ValueError as e:
+                    messagebox.showerror("Erro", str(e))
+                    return
+                processar_valores(nucleo)
+                ultimo_nucleo.update(nome=os.path.basename(caminho_arquivo), nucleo=nucleo)
             else:
                 messagebox.showwarning("Aviso", "Seleção de arquivo cancelada.")
         except FileNotFoundError:
             messagebox.showerror("Erro", "Arquivo de núcleo não encontrado.")
 
+    # Relatório (sob demanda) do último núcleo carregado: ele é separável?
+    # quanto as duas passadas 1D ganham sobre a convolução 2D direta? As
+    # medidas rodam em uma thread e o rótulo é atualizado com after(),
+    # sem travar a janela
+    ultimo_nucleo = {'nome': None, 'nucleo': None}
+    medicao = {'texto': None}
+
+    def relatorio_nucleo():
+        if ultimo_nucleo['nucleo'] is None:
+            messagebox.showwarning("Aviso", "Carregue um núcleo de um arquivo primeiro.")
+            return
+        nome, nucleo, atual = ultimo_nucleo['nome'], ultimo_nucleo['nucleo'], imagem
+
+        def medir():
+            medicao['texto'] = f"{nome}: {descrever_ganho(comparar_separavel(atual, nucleo, repeticoes=1))}"
+
+        medicao['texto'] = None
+        botao_relatorio.config(state=tk.DISABLED)
+        rotulo_relatorio.config(text=f"{nome}: medindo...")
+        threading.Thread(target=medir, daemon=True).start()
+        janela.after(100, mostrar_relatorio)
+
+    def mostrar_relatorio():
+        if medicao['texto'] is None:
+            janela.after(100, mostrar_relatorio)
+            return
+        rotulo_relatorio.config(text=medicao['texto'])
+        botao_relatorio.config(state=tk.NORMAL)
+
     entradas = []
     for i in range(9):
         entrada = tk.Entry(janela, width=5, bg='#ffffff', fg='#333333', font=('Arial', 14), justify='center')
@@ -90,21 +151,46 @@ def criar_interface():
     botao_carregar_nucleo = tk.Button(janela, text="Carregar Núcleo", command=carregar_nucleo, **estilo_botao)
     botao_carregar_nucleo.grid(row=6, column=3, columnspan=3, padx=10, pady=10)
 
-    janela.mainloop()
+    borda = tk.StringVar(janela, value='ignorar')
+    tk.Label(janela, text="Borda:", bg='#f0f0f0', font=('Arial', 12)).grid(row=7, column=3, padx=5, pady=10)
+    menu_borda = tk.OptionMenu(janela, borda, *MODOS_BORDA)
+    menu_borda.grid(row=7, column=4, columnspan=2, padx=5, pady=10)
+
+    metodo = tk.StringVar(janela, value='auto')
+    tk.Label(janela, text="Método:", bg='#f0f0f0', font=('Arial', 12)).grid(row=8, column=3, padx=5, pady=10)
+    menu_metodo = tk.OptionMenu(janela, metodo, *METODOS)
+    menu_metodo.grid(row=8, column=4, columnspan=2, padx=5, pady=10)
+
+    cor = tk.StringVar(janela, value='cinza')
+    tk.Label(janela, text="Cor:", bg='#f0f0f0', font=('Arial', 12)).grid(row=11, column=3, padx=5, pady=10)
+    menu_cor = tk.OptionMenu(janela, cor, *MODOS_COR)
+    menu_cor.grid(row=11, column=4, columnspan=2, padx=5, pady=10)
 
-def aplicar_convolucao(nucleo):
-    altura, largura = imagem.shape
-    imagem_convolucao = np.zeros((altura, largura), dtype=np.float32)
+    botao_relatorio = tk.Button(janela, text="Relatório do Núcleo", command=relatorio_nucleo, **estilo_botao)
+    botao_relatorio.grid(row=9, column=3, columnspan=3, padx=10, pady=10)
 
-    for y in range(1, altura - 1):
-        for x in range(1, largura - 1):
-            soma = 0
-            for ky in range(-1, 2):
-                for kx in range(-1, 2):
-                    soma += imagem[y + ky, x + kx] * nucleo[ky + 1][kx + 1]
-            imagem_convolucao[y, x] = soma
+    rotulo_relatorio = tk.Label(janela, text="", bg='#f0f0f0', font=('Arial', 10), wraplength=300, justify='left')
+    rotulo_relatorio.grid(row=12, column=3, columnspan=3, padx=5, pady=10)
+
+    botao_desfazer = tk.Button(janela, text="Desfazer", command=desfazer, **estilo_botao)
+    botao_desfazer.grid(row=10, column=3, padx=5, pady=10)
+
+    botao_refazer = tk.Button(janela, text="Refazer", command=refazer, **estilo_botao)
+    botao_refazer.grid(row=10, column=4, columnspan=2, padx=5, pady=10)
+
+    janela.mainloop()
 
-    imagem_convolucao = np.clip(imagem_convolucao, 0, 255).astype(np.uint8)
+# O OpenCV carrega as imagens coloridas em BGR; o PIL espera RGB
+def para_exibir(imagem):
+    return cv2.cvtColor(imagem, cv2.COLOR_BGR2RGB) if imagem.ndim == 3 else imagem
+
+# A convolução é feita em ladrilhos e cada ladrilho já é escrito em uint8
+# (limitado a 0..255), sem uma cópia float32 do tamanho da imagem. Imagens
+# coloridas (altura x largura x canais) são convolvidas em todos os canais
+# de uma vez, ou só na luminância com canais='luminancia'
+def aplicar_convolucao(nucleo, borda='ignorar', metodo='auto', canais='todos'):
+    imagem_convolucao = np.empty(imagem.shape, dtype=np.uint8)
+    convolver_ladrilhos(imagem, nucleo, imagem_convolucao, borda, metodo, canais=canais)
     return imagem_convolucao
 
 if __name__ == "__main__":
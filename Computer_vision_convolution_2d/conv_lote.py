@@ -0,0 +1,209 @@
+# Aplica núcleos de convolução a todas as imagens de diretórios ou globs,
+# sem a interface gráfica
+# Exemplo de uso:
+# $ python conv_lote.py fotos "outras/**/*.png" -n mh.txt mv.txt -s convolvidas -p 8 > tempos.jsonl
+#
+# Cada arquivo de núcleo (NxN, N ímpar, no formato de nucleo.txt) gera uma
+# imagem de saída <nome>_<núcleo>.png, na mesma subpasta relativa à
+# entrada (a árvore de diretórios é repetida dentro de -s); com
+# --encadear os núcleos são fundidos em um só e cada imagem gera uma única
+# saída. Duas entradas que gerariam a mesma saída (x.jpg e x.png, por
+# exemplo) não se sobrescrevem: a segunda é informada como erro. Imagens
+# dentro de -s nunca são lidas como entrada. A leitura, a convolução e a
+# escrita de cada imagem acontecem nos processos, e só algumas imagens
+# por processo ficam em andamento ao mesmo tempo (--prefetch),
+# então a memória não cresce com a quantidade de imagens. Cada imagem gera
+# uma linha JSON com os tempos; o resumo com a vazão total sai no stderr.
+
+import fnmatch
+import glob
+import json
+import os
+import sys
+import time
+from argparse import ArgumentParser
+from collections import deque
+from multiprocessing import Pool
+
+import cv2
+import numpy as np
+
+from convolucao import ler_nucleo, fundir_nucleos, MODOS_BORDA, METODOS
+from ladrilhos import convolver_ladrilhos, MODOS_COR
+
+PADROES_IMAGEM = ('*.jpg', '*.jpeg', '*.png', '*.bmp', '*.tif', '*.tiff')
+
+# Núcleos (nome, núcleo) e opções de cada processo
+nucleos_processo = None
+opcoes_processo = None
+
+def iniciar_processo(nucleos, opcoes):
+    global nucleos_processo, opcoes_processo
+    nucleos_processo = nucleos
+    opcoes_processo = opcoes
+
+# 'base' é o caminho de saída sem o sufixo do núcleo e a extensão
+def convolver_arquivo(tarefa):
+    caminho, base = tarefa
+    inicio = time.perf_counter()
+    leitura_cv2, canais = MODOS_COR[opcoes_processo['cor']]
+    imagem = cv2.imread(caminho, leitura_cv2)
+    if imagem is None:
+        return {'arquivo': caminho, 'erro': 'imagem não pode ser carregada'}
+    leitura = time.perf_counter() - inicio
+
+    os.makedirs(os.path.dirname(base), exist_ok=True)
+    convolucao = escrita = 0.0
+    saidas = []
+    for nome, nucleo in nucleos_processo:
+        inicio = time.perf_counter()
+        resultado = np.empty(imagem.shape, dtype=np.uint8)
+        # Um processo por imagem já ocupa as CPUs: sem threads aqui dentro
+        convolver_ladrilhos(imagem, nucleo, resultado, opcoes_processo['borda'],
+                            opcoes_processo['metodo'], threads=1, canais=canais)
+        convolucao += time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        saida = f'{base}_{nome}{opcoes_processo["extensao"]}'
+        if not cv2.imwrite(saida, resultado):
+            return {'arquivo': caminho, 'erro': f'não foi possível escrever {saida}'}
+        escrita += time.perf_counter() - inicio
+        saidas.append(saida)
+
+    return {
+        'arquivo': caminho,
+        'saidas': saidas,
+        'largura': imagem.shape[1],
+        'altura': imagem.shape[0],
+        'megapixels': imagem.shape[0] * imagem.shape[1] / 1e6,
+        'leitura': round(leitura, 6),
+        'convolucao': round(convolucao, 6),
+        'escrita': round(escrita, 6),
+        'segundos': round(leitura + convolucao + escrita, 6),
+    }
+
+# Pasta fixa do começo de um glob (as partes antes do primeiro curinga);
+# para um arquivo sem curingas, a própria pasta dele
+def raiz_glob(padrao):
+    if not glob.has_magic(padrao):
+        return os.path.dirname(padrao) or '.'
+    fixas = []
+    for parte in padrao.replace(os.sep, '/').split('/'):
+        if glob.has_magic(parte):
+            break
+        fixas.append(parte)
+    return '/'.join(fixas) or ('/' if padrao.startswith('/') else '.')
+
+# Percorre um diretório recursivamente, sem entrar nas pastas ignoradas
+# (caminhos reais)
+def percorrer(diretorio, ignoradas, padroes):
+    for pasta, subpastas, nomes in os.walk(diretorio):
+        subpastas[:] = [nome for nome in subpastas
+                        if os.path.realpath(os.path.join(pasta, nome)) not in ignoradas]
+        for nome in sorted(nomes):
+            if any(fnmatch.fnmatch(nome.lower(), padrao) for padrao in padroes):
+                yield os.path.join(pasta, nome)
+
+# Verdadeiro se o caminho está dentro de uma das pastas ignoradas
+def dentro_de(caminho, ignoradas):
+    real = os.path.realpath(caminho)
+    return any(real == pasta or real.startswith(pasta + os.sep) for pasta in ignoradas)
+
+# Expande diretórios (recursivamente, filtrando pelos padrões de nome) e
+# globs em uma lista de (imagem, caminho relativo à pasta da entrada), sem
+# repetições. Nada é lido de dentro das pastas 'ignorar' (a pasta de saída,
+# para que uma nova execução não convolva as saídas da anterior)
+def listar_imagens(entradas, padroes=PADROES_IMAGEM, ignorar=()):
+    ignoradas = {os.path.realpath(pasta) for pasta in ignorar}
+    vistos = set()
+    for entrada in entradas:
+        if os.path.isdir(entrada):
+            if dentro_de(entrada, ignoradas):
+                continue
+            raiz = entrada
+            candidatos = percorrer(entrada, ignoradas, padroes)
+        else:
+            raiz = raiz_glob(entrada)
+            candidatos = sorted(glob.glob(entrada, recursive=True))
+        for caminho in candidatos:
+            if os.path.isfile(caminho) and caminho not in vistos and not dentro_de(caminho, ignoradas):
+                vistos.add(caminho)
+                yield caminho, os.path.relpath(caminho, raiz)
+
+# Monta as tarefas (imagem, base da saída). Uma imagem cuja saída já foi
+# usada por outra vira um erro, em vez de sobrescrever a anterior
+def tarefas_saida(imagens, saida, erros_saida):
+    usadas = {}
+    for caminho, relativo in imagens:
+        base = os.path.join(saida, os.path.splitext(relativo)[0])
+        if base in usadas:
+            erros_saida.append({'arquivo': caminho, 'erro': f'mesma saída de {usadas[base]}'})
+            continue
+        usadas[base] = caminho
+        yield caminho, base
+
+# Como imap, mas com no máximo 'limite' tarefas em andamento: a lista de
+# imagens é consumida aos poucos, conforme os resultados ficam prontos
+def imap_limitado(pool, funcao, itens, limite):
+    pendentes = deque()
+    for item in itens:
+        pendentes.append(pool.apply_async(funcao, (item,)))
+        if len(pendentes) >= limite:
+            yield pendentes.popleft().get()
+    while pendentes:
+        yield pendentes.popleft().get()
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='Convolução em lote de imagens')
+    parser.add_argument('entradas', nargs='+',
+                        help='Diretórios ou globs com as imagens')
+    parser.add_argument('-n', '--nucleos', nargs='+', default=['nucleo.txt'],
+                        help='Arquivos de núcleo (NxN, N ímpar)')
+    parser.add_argument('--encadear', action='store_true',
+                        help='Funde os núcleos em um só e gera uma única saída por imagem')
+    parser.add_argument('-s', '--saida', default='convolvidas',
+                        help='Diretório das imagens de saída')
+    parser.add_argument('-e', '--extensao', default='.png',
+                        help='Formato das imagens de saída (.png, .jpg, ...)')
+    parser.add_argument('-b', '--borda', default='ignorar', choices=list(MODOS_BORDA))
+    parser.add_argument('-m', '--metodo', default='auto', choices=METODOS)
+    parser.add_argument('-c', '--cor', default='cinza', choices=list(MODOS_COR),
+                        help='cinza, cor (todos os canais) ou luminancia (só o Y do YCbCr)')
+    parser.add_argument('-p', '--processos', type=int, default=os.cpu_count(),
+                        help='Quantidade de processos')
+    parser.add_argument('--prefetch', type=int, default=2,
+                        help='Imagens em andamento por processo')
+    args = parser.parse_args()
+
+    try:
+        nucleos = [(os.path.splitext(os.path.basename(caminho))[0], ler_nucleo(caminho))
+                   for caminho in args.nucleos]
+    except (OSError, ValueError) as erro:
+        parser.error(str(erro))
+    if args.encadear:
+        nucleos = [('_'.join(nome for nome, _ in nucleos), fundir_nucleos([n for _, n in nucleos]))]
+    os.makedirs(args.saida, exist_ok=True)
+    opcoes = {'saida': args.saida, 'extensao': args.extensao, 'borda': args.borda, 'metodo': args.metodo,
+              'cor': args.cor}
+
+    inicio = time.perf_counter()
+    total_imagens = erros = 0
+    total_megapixels = 0.0
+    erros_saida = []
+    with Pool(args.processos, initializer=iniciar_processo, initargs=(nucleos, opcoes)) as pool:
+        tarefas = tarefas_saida(listar_imagens(args.entradas, ignorar=[args.saida]), args.saida, erros_saida)
+        for resultado in imap_limitado(pool, convolver_arquivo, tarefas, args.processos * args.prefetch):
+            print(json.dumps(resultado, ensure_ascii=False), flush=True)
+            if 'erro' in resultado:
+                erros += 1
+                continue
+            total_imagens += 1
+            total_megapixels += resultado['megapixels']
+    for resultado in erros_saida:
+        print(json.dumps(resultado, ensure_ascii=False), flush=True)
+    erros += len(erros_saida)
+    segundos = time.perf_counter() - inicio
+
+    vazao = total_megapixels * len(nucleos) / segundos if segundos > 0 else 0
+    print(f'Imagens: {total_imagens} (erros: {erros}), núcleos por imagem: {len(nucleos)}', file=sys.stderr)
+    print(f'Megapixels: {total_megapixels:.2f} em {segundos:.3f} s ({vazao:.2f} MP/s convolvidos)', file=sys.stderr)
@@ -0,0 +1,215 @@
+import numpy as np
+
+# Modos de borda:
+# 'ignorar'  - não calcula os pixels a menos de meio núcleo da borda (ficam 0),
+#              como o laço original de aplicar_convolucao
+# 'zero'     - considera que fora da imagem os pixels valem 0
+# 'replicar' - repete o pixel da borda
+# 'refletir' - espelha a imagem na borda (sem repetir o pixel da borda)
+MODOS_BORDA = {'ignorar': None, 'zero': 'constant', 'replicar': 'edge', 'refletir': 'reflect'}
+
+# Pesos da luminância (Y do YCbCr, BT.601) na ordem BGR em que o OpenCV
+# carrega as imagens coloridas
+PESOS_LUMINANCIA = np.array([0.114, 0.587, 0.299])
+
+# Como o Y entra com peso 1 em cada canal na volta do YCbCr para BGR,
+# alterar só a luminância (mantendo Cb e Cr) é somar a diferença
+# Y' - Y aos três canais
+def luminancia(imagem):
+    return imagem @ PESOS_LUMINANCIA
+
+def validar_nucleo(nucleo):
+    nucleo = np.asarray(nucleo, dtype=np.float64)
+    if nucleo.ndim != 2 or nucleo.shape[0] % 2 == 0 or nucleo.shape[1] % 2 == 0:
+        raise ValueError("O núcleo deve ser uma matriz com lados ímpares (3x3, 5x5, 7x7...).")
+    return nucleo
+
+# Lê um arquivo de núcleo: NxN valores (N ímpar) separados por espaços
+# ou quebras de linha
+def ler_nucleo(caminho):
+    with open(caminho, 'r') as arquivo:
+        valores = [float(valor) for valor in arquivo.read().split()]
+    lado = int(round(len(valores) ** 0.5))
+    if lado * lado != len(valores) or lado % 2 == 0:
+        raise ValueError("O núcleo deve ter NxN valores, com N ímpar.")
+    return [valores[i:i+lado] for i in range(0, len(valores), lado)]
+
+def preparar_borda(imagem, raio_y, raio_x, borda):
+    if borda not in MODOS_BORDA:
+        raise ValueError(f"Modo de borda inválido: {borda}")
+    if borda == 'ignorar':
+        return imagem
+    # Imagens coloridas (altura x largura x canais) não têm borda nos canais
+    canais = ((0, 0),) * (imagem.ndim - 2)
+    return np.pad(imagem, ((raio_y, raio_y), (raio_x, raio_x)) + canais, mode=MODOS_BORDA[borda])
+
+# Região da saída que é calculada e imagem de onde ela é lida (já com a
+# borda). Retorna (fonte, destino, altura_util, largura_util)
+def preparar_regioes(imagem, forma_nucleo, borda, saida):
+    altura, largura = imagem.shape[:2]
+    raio_y, raio_x = forma_nucleo[0] // 2, forma_nucleo[1] // 2
+    fonte = preparar_borda(imagem, raio_y, raio_x, borda)
+    if borda == 'ignorar':
+        saida[:] = 0
+        altura_util, largura_util = altura - 2 * raio_y, largura - 2 * raio_x
+        destino = saida[raio_y:altura - raio_y, raio_x:largura - raio_x] if altura_util > 0 and largura_util > 0 else None
+        return fonte, destino, altura_util, largura_util
+    return fonte, saida, altura, largura
+
+# Convolução direta vetorizada: em vez de percorrer pixel por pixel, cada
+# posição do núcleo multiplica uma fatia deslocada da imagem inteira e o
+# resultado é acumulado. As parcelas são somadas em float64 e na mesma
+# ordem do laço original, então o resultado para 3x3 é idêntico.
+def convolver_direto(imagem, nucleo, borda, saida):
+    fonte, destino, altura_util, largura_util = preparar_regioes(imagem, nucleo.shape, borda, saida)
+    if destino is None:
+        return saida
+
+    soma = np.zeros((altura_util, largura_util) + imagem.shape[2:], dtype=np.float64)
+    parcela = np.empty_like(soma)
+    for ky in range(nucleo.shape[0]):
+        for kx in range(nucleo.shape[1]):
+            peso = nucleo[ky, kx]
+            if peso == 0:
+                continue
+            np.multiply(fonte[ky:ky + altura_util, kx:kx + largura_util], peso, out=parcela)
+            soma += parcela
+    destino[:] = soma
+    return saida
+
+# Núcleo separável (coluna x linha): uma passada horizontal com a linha e
+# uma vertical com a coluna, custando kh + kw operações por pixel em vez
+# de kh * kw
+def convolver_separavel(imagem, coluna, linha, borda, saida):
+    coluna = np.asarray(coluna, dtype=np.float64).ravel()
+    linha = np.asarray(linha, dtype=np.float64).ravel()
+    fonte, destino, altura_util, largura_util = preparar_regioes(imagem, (len(coluna), len(linha)), borda, saida)
+    if destino is None:
+        return saida
+
+    horizontal = np.zeros((fonte.shape[0], largura_util) + imagem.shape[2:], dtype=np.float64)
+    parcela = np.empty_like(horizontal)
+    for kx, peso in enumerate(linha):
+        if peso != 0:
+            np.multiply(fonte[:, kx:kx + largura_util], peso, out=parcela)
+            horizontal += parcela
+
+    soma = np.zeros((altura_util, largura_util) + imagem.shape[2:], dtype=np.float64)
+    parcela = np.empty_like(soma)
+    for ky, peso in enumerate(coluna):
+        if peso != 0:
+            np.multiply(horizontal[ky:ky + altura_util], peso, out=parcela)
+            soma += parcela
+    destino[:] = soma
+    return saida
+
+# Detecta se o núcleo é separável (posto 1, ou seja, coluna x linha).
+# O posto vem da SVD: o núcleo é separável se os valores singulares
+# além do primeiro forem desprezíveis em relação a ele (tolerancia).
+# Os fatores são tirados de uma linha e uma coluna do próprio núcleo, e
+# não dos vetores singulares, para que núcleos inteiros como mh.txt
+# tenham fatores exatos. Retorna (coluna, linha) ou None
+TOLERANCIA_SEPARAVEL = 1e-6
+
+def fatorar_nucleo(nucleo, tolerancia=TOLERANCIA_SEPARAVEL):
+    nucleo = validar_nucleo(nucleo)
+    singulares = np.linalg.svd(nucleo, compute_uv=False)
+    if singulares[0] == 0 or singulares[1:].sum() > tolerancia * singulares[0]:
+        return None
+    i, j = np.unravel_index(np.argmax(np.abs(nucleo)), nucleo.shape)
+    return nucleo[:, j].copy(), nucleo[i, :] / nucleo[i, j]
+
+# Funde uma sequência de núcleos em um só: aplicar o núcleo fundido uma vez
+# equivale a aplicar os núcleos um depois do outro (sem o corte em 0..255
+# entre as aplicações). Como a operação aqui é a correlação, o núcleo
+# fundido é a convolução completa dos núcleos entre si
+def fundir_nucleos(nucleos):
+    fundido = np.ones((1, 1))
+    for nucleo in nucleos:
+        nucleo = validar_nucleo(nucleo)
+        altura, largura = fundido.shape
+        composto = np.zeros((altura + nucleo.shape[0] - 1, largura + nucleo.shape[1] - 1))
+        for ky in range(nucleo.shape[0]):
+            for kx in range(nucleo.shape[1]):
+                if nucleo[ky, kx] != 0:
+                    composto[ky:ky + altura, kx:kx + largura] += nucleo[ky, kx] * fundido
+        fundido = composto
+    return fundido
+
+# Menor tamanho >= n cujos fatores primos são só 2, 3 e 5 (a FFT é mais
+# rápida nesses tamanhos)
+def tamanho_rapido(n):
+    while True:
+        m = n
+        for primo in (2, 3, 5):
+            while m % primo == 0:
+                m //= primo
+        if m == 1:
+            return n
+        n += 1
+
+# Convolução pela FFT: o produto das transformadas da imagem e do núcleo
+# (espelhado, pois a operação aqui é a correlação, como no laço original).
+# As transformadas têm pelo menos o tamanho da imagem com borda, o que
+# evita que a convolução circular contamine a região útil.
+def convolver_fft(imagem, nucleo, borda, saida):
+    fonte, destino, altura_util, largura_util = preparar_regioes(imagem, nucleo.shape, borda, saida)
+    if destino is None:
+        return saida
+
+    # Em imagens coloridas as transformadas são feitas nos eixos da altura
+    # e da largura, e o espectro do núcleo vale para todos os canais
+    forma = (tamanho_rapido(fonte.shape[0]), tamanho_rapido(fonte.shape[1]))
+    espectro = np.fft.rfft2(fonte, forma, axes=(0, 1))
+    espectro *= np.fft.rfft2(nucleo[::-1, ::-1], forma).reshape(espectro.shape[:2] + (1,) * (fonte.ndim - 2))
+    resultado = np.fft.irfft2(espectro, forma, axes=(0, 1))
+    ky, kx = nucleo.shape[0] - 1, nucleo.shape[1] - 1
+    destino[:] = resultado[ky:ky + altura_util, kx:kx + largura_util]
+    return saida
+
+# Modelo de custo: estimativa do tempo de cada método, em operações.
+# As constantes foram ajustadas com benchmark_convolucao.py
+CUSTO_DIRETO = 1.0
+CUSTO_SEPARAVEL = 1.0
+CUSTO_FFT = 2.0
+
+def custo_metodos(altura, largura, altura_nucleo, largura_nucleo, separavel=False):
+    pixels = altura * largura
+    custos = {'direto': CUSTO_DIRETO * pixels * altura_nucleo * largura_nucleo}
+    if separavel:
+        # + 3: a imagem intermediária, a cópia final para a saída e a
+        # passada extra (em 3x3 o método direto ainda vence)
+        custos['separavel'] = CUSTO_SEPARAVEL * pixels * (altura_nucleo + largura_nucleo + 3)
+    area = tamanho_rapido(altura + altura_nucleo - 1) * tamanho_rapido(largura + largura_nucleo - 1)
+    custos['fft'] = CUSTO_FFT * area * np.log2(area)
+    return custos
+
+def escolher_metodo(altura, largura, altura_nucleo, largura_nucleo, separavel=False):
+    custos = custo_metodos(altura, largura, altura_nucleo, largura_nucleo, separavel)
+    return min(custos, key=custos.get)
+
+METODOS = ('auto', 'direto', 'separavel', 'fft')
+
+# Aplica a convolução com o método escolhido ('auto' usa o modelo de custo).
+# 'fatores' = (coluna, linha) de um núcleo separável; se não forem
+# passados, fatorar_nucleo verifica se o núcleo é separável.
+# O resultado é escrito em 'saida' (float32, alocada se não for passada).
+def convolver(imagem, nucleo, borda='ignorar', saida=None, metodo='auto', fatores=None):
+    nucleo = validar_nucleo(nucleo)
+    if metodo not in METODOS:
+        raise ValueError(f"Método inválido: {metodo}")
+    if imagem.ndim not in (2, 3):
+        raise ValueError("A imagem deve ter 2 dimensões (cinza) ou 3 (altura x largura x canais).")
+    if saida is None:
+        saida = np.zeros(imagem.shape, dtype=np.float32)
+    if fatores is None and metodo in ('auto', 'separavel'):
+        fatores = fatorar_nucleo(nucleo)
+    if metodo == 'auto':
+        metodo = escolher_metodo(*imagem.shape[:2], *nucleo.shape, separavel=fatores is not None)
+    if metodo == 'separavel':
+        if fatores is None:
+            raise ValueError("O núcleo não é separável (posto maior que 1).")
+        return convolver_separavel(imagem, fatores[0], fatores[1], borda, saida)
+    if metodo == 'fft':
+        return convolver_fft(imagem, nucleo, borda, saida)
+    return convolver_direto(imagem, nucleo, borda, saida)
@@ -0,0 +1,118 @@
+# Histórico de convoluções aplicadas a uma imagem, com desfazer/refazer.
+# Cada estado é a cadeia de núcleos aplicados desde a imagem original. Os
+# núcleos de uma cadeia são fundidos em um só (convolucao.fundir_nucleos)
+# e a imagem do estado é calculada em uma única passada sobre a original.
+# As imagens já calculadas ficam em um cache LRU indexado pelo hash da
+# cadeia, então desfazer, refazer e voltar a uma cadeia conhecida não
+# recalculam nada.
+
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+
+from convolucao import validar_nucleo, fundir_nucleos
+from ladrilhos import convolver_ladrilhos
+
+LIMITE_CACHE = 256 << 20
+
+def chave_cadeia(nucleos, borda, metodo, canais='todos'):
+    resumo = hashlib.sha256(f"{borda}|{metodo}|{canais}".encode())
+    for nucleo in nucleos:
+        resumo.update(repr(nucleo.shape).encode())
+        resumo.update(nucleo.tobytes())
+    return resumo.hexdigest()
+
+# Imagens indexadas pela chave da cadeia; quando o total passa do limite
+# (em bytes), as usadas há mais tempo são descartadas
+class CacheImagens:
+
+    def __init__(self, limite=LIMITE_CACHE):
+        self.limite = limite
+        self.imagens = OrderedDict()
+        self.total = 0
+
+    def obter(self, chave):
+        imagem = self.imagens.get(chave)
+        if imagem is not None:
+            self.imagens.move_to_end(chave)
+        return imagem
+
+    def guardar(self, chave, imagem):
+        if chave in self.imagens:
+            self.total -= self.imagens.pop(chave).nbytes
+        self.imagens[chave] = imagem
+        self.total += imagem.nbytes
+        while self.total > self.limite and len(self.imagens) > 1:
+            _, antiga = self.imagens.popitem(last=False)
+            self.total -= antiga.nbytes
+
+class HistoricoConvolucao:
+
+    def __init__(self, original, limite_cache=LIMITE_CACHE):
+        self.original = original
+        self.estados = [()]  # cadeias de núcleos; () é a imagem original
+        self.atual = 0
+        self.cache = CacheImagens(limite_cache)
+
+    @property
+    def cadeia(self):
+        return self.estados[self.atual]
+
+    def _novo_estado(self, cadeia):
+        # Um novo estado descarta os que poderiam ser refeitos
+        del self.estados[self.atual + 1:]
+        self.estados.append(cadeia)
+        self.atual += 1
+
+    def aplicar(self, nucleo, borda='ignorar', metodo='auto', canais='todos'):
+        nucleo = validar_nucleo(nucleo)
+        nucleo.flags.writeable = False
+        # A imagem é calculada antes de criar o estado: se a convolução
+        # falhar (núcleo não separável com o método 'separavel', por
+        # exemplo), o histórico fica como estava
+        cadeia = self.cadeia + (nucleo,)
+        imagem = self.imagem_cadeia(cadeia, borda, metodo, canais)
+        self._novo_estado(cadeia)
+        return imagem
+
+    def resetar(self):
+        self._novo_estado(())
+        return self.original
+
+    def pode_desfazer(self):
+        return self.atual > 0
+
+    def pode_refazer(self):
+        return self.atual + 1 < len(self.estados)
+
+    def desfazer(self, borda='ignorar', metodo='auto', canais='todos'):
+        if self.pode_desfazer():
+            self.atual -= 1
+        return self.imagem(borda, metodo, canais)
+
+    def refazer(self, borda='ignorar', metodo='auto', canais='todos'):
+        if self.pode_refazer():
+            self.atual += 1
+        return self.imagem(borda, metodo, canais)
+
+    def nucleo_fundido(self):
+        return fundir_nucleos(self.cadeia)
+
+    # Imagem de uma cadeia: do cache, ou uma única convolução da original
+    # com o núcleo fundido da cadeia
+    def imagem_cadeia(self, cadeia, borda='ignorar', metodo='auto', canais='todos'):
+        if not cadeia:
+            return self.original
+        chave = chave_cadeia(cadeia, borda, metodo, canais)
+        imagem = self.cache.obter(chave)
+        if imagem is None:
+            imagem = np.empty(self.original.shape, dtype=np.uint8)
+            convolver_ladrilhos(self.original, fundir_nucleos(cadeia), imagem, borda, metodo, canais=canais)
+            imagem.flags.writeable = False
+            self.cache.guardar(chave, imagem)
+        return imagem
+
+    # Imagem do estado atual
+    def imagem(self, borda='ignorar', metodo='auto', canais='todos'):
+        return self.imagem_cadeia(self.cadeia, borda, metodo, canais)
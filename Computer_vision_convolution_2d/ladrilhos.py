@@ -0,0 +1,166 @@
+# Convolução em ladrilhos, para imagens que não cabem na memória
+# Exemplo de uso:
+# $ python ladrilhos.py satelite.npy saida.npy -n nucleo.txt --ladrilho 2048 --threads 8
+#
+# A entrada e a saída .npy são mapeadas em memória (mmap). Cada ladrilho
+# é lido com uma margem do tamanho do raio do núcleo, convolvido e escrito
+# direto na saída, então a memória usada fica em torno de
+# threads x ladrilho, e não do tamanho da imagem. Os ladrilhos são
+# processados em threads: as operações do NumPy liberam o GIL.
+
+import os
+import time
+from argparse import ArgumentParser
+from multiprocessing.pool import ThreadPool
+
+import cv2
+import numpy as np
+
+from convolucao import convolver, validar_nucleo, fatorar_nucleo, ler_nucleo, luminancia, MODOS_BORDA, METODOS
+
+LADRILHO = 1024
+
+# 'todos': convolve cada canal da imagem (em uma única passada vetorizada)
+# 'luminancia': em imagens coloridas, convolve só o Y do YCbCr
+CANAIS = ('todos', 'luminancia')
+
+# Como as imagens são carregadas e quais canais são convolvidos:
+# modo -> (flag do cv2.imread, canais)
+MODOS_COR = {
+    'cinza': (cv2.IMREAD_GRAYSCALE, 'todos'),
+    'cor': (cv2.IMREAD_COLOR, 'todos'),
+    'luminancia': (cv2.IMREAD_COLOR, 'luminancia'),
+}
+
+# Retângulos (y0, x0, y1, x1) que cobrem a imagem
+def posicoes_ladrilhos(altura, largura, ladrilho=LADRILHO):
+    for y in range(0, altura, ladrilho):
+        for x in range(0, largura, ladrilho):
+            yield y, x, min(y + ladrilho, altura), min(x + ladrilho, largura)
+
+# Lê o ladrilho com a margem do raio do núcleo. Onde a margem sai da
+# imagem ela é completada conforme o modo de borda, como se a imagem
+# inteira tivesse passado por preparar_borda
+def ler_com_margem(entrada, posicao, raio_y, raio_x, borda):
+    y0, x0, y1, x1 = posicao
+    altura, largura = entrada.shape[:2]
+    topo, base = max(y0 - raio_y, 0), min(y1 + raio_y, altura)
+    esquerda, direita = max(x0 - raio_x, 0), min(x1 + raio_x, largura)
+    bloco = np.asarray(entrada[topo:base, esquerda:direita])
+    falta = ((topo - (y0 - raio_y), y1 + raio_y - base),
+             (esquerda - (x0 - raio_x), x1 + raio_x - direita))
+    if any(falta[0]) or any(falta[1]):
+        falta += ((0, 0),) * (bloco.ndim - 2)
+        bloco = np.pad(bloco, falta, mode=MODOS_BORDA[borda] or 'constant')
+    return bloco
+
+def convolver_ladrilho(entrada, nucleo, saida, posicao, borda, metodo, fatores, canais='todos'):
+    y0, x0, y1, x1 = posicao
+    raio_y, raio_x = nucleo.shape[0] // 2, nucleo.shape[1] // 2
+    bloco = ler_com_margem(entrada, posicao, raio_y, raio_x, borda)
+    centro = (slice(raio_y, raio_y + y1 - y0), slice(raio_x, raio_x + x1 - x0))
+    if canais == 'luminancia':
+        # Y' é calculado em float64, como Y, para que Y' - Y seja exatamente
+        # 0 onde o núcleo não muda a luminância; o resultado é arredondado
+        # (e não truncado) ao voltar para inteiro
+        brilho = luminancia(bloco)
+        novo_brilho = convolver(brilho, nucleo, 'ignorar', np.empty(brilho.shape), metodo, fatores)
+        diferenca = novo_brilho[centro] - brilho[centro]
+        resultado = bloco[centro] + diferenca[..., np.newaxis]
+        if np.issubdtype(saida.dtype, np.integer):
+            np.rint(resultado, out=resultado)
+    else:
+        resultado = convolver(bloco, nucleo, 'ignorar', metodo=metodo, fatores=fatores)[centro]
+
+    if borda == 'ignorar':
+        # Zera os pixels a menos de meio núcleo da borda da imagem
+        altura, largura = entrada.shape[:2]
+        resultado[:max(raio_y - y0, 0)] = 0
+        resultado[max(altura - raio_y - y0, 0):] = 0
+        resultado[:, :max(raio_x - x0, 0)] = 0
+        resultado[:, max(largura - raio_x - x0, 0):] = 0
+
+    if np.issubdtype(saida.dtype, np.integer):
+        limites = np.iinfo(saida.dtype)
+        np.clip(resultado, limites.min, limites.max, out=resultado)
+    saida[y0:y1, x0:x1] = resultado
+
+# Mesmos parâmetros de convolucao.convolver, mas a imagem é percorrida em
+# ladrilhos. 'saida' pode ser um array mapeado em memória; se for inteira
+# (uint8), os valores são limitados ao intervalo do tipo. A entrada pode
+# ter vários canais (altura x largura x canais)
+def convolver_ladrilhos(entrada, nucleo, saida=None, borda='ignorar', metodo='auto', fatores=None,
+                        ladrilho=LADRILHO, threads=None, canais='todos'):
+    nucleo = validar_nucleo(nucleo)
+    if borda not in MODOS_BORDA:
+        raise ValueError(f"Modo de borda inválido: {borda}")
+    if canais not in CANAIS:
+        raise ValueError(f"Opção de canais inválida: {canais}")
+    if entrada.ndim not in (2, 3):
+        raise ValueError("A imagem deve ter 2 dimensões (cinza) ou 3 (altura x largura x canais).")
+    if canais == 'luminancia' and (entrada.ndim != 3 or entrada.shape[2] != 3):
+        raise ValueError("A convolução da luminância precisa de uma imagem colorida com 3 canais.")
+    if saida is None:
+        saida = np.zeros(entrada.shape, dtype=np.float32)
+    elif saida.shape != entrada.shape:
+        raise ValueError("A saída deve ter o mesmo tamanho da imagem.")
+    # A separabilidade é verificada uma vez, e não em cada ladrilho
+    if fatores is None and metodo in ('auto', 'separavel'):
+        fatores = fatorar_nucleo(nucleo)
+        if fatores is None and metodo == 'separavel':
+            raise ValueError("O núcleo não é separável (posto maior que 1).")
+
+    def tarefa(posicao):
+        convolver_ladrilho(entrada, nucleo, saida, posicao, borda, metodo, fatores, canais)
+
+    posicoes = list(posicoes_ladrilhos(*entrada.shape[:2], ladrilho))
+    threads = min(threads or os.cpu_count() or 1, len(posicoes))
+    if threads <= 1:
+        for posicao in posicoes:
+            tarefa(posicao)
+    else:
+        with ThreadPool(threads) as pool:
+            for _ in pool.imap_unordered(tarefa, posicoes):
+                pass
+    return saida
+
+# Imagens .npy são mapeadas em memória; os outros formatos precisam ser
+# decodificados inteiros pelo OpenCV
+def abrir_entrada(caminho, cor='cinza'):
+    if caminho.endswith('.npy'):
+        return np.load(caminho, mmap_mode='r')
+    imagem = cv2.imread(caminho, MODOS_COR[cor][0])
+    if imagem is None:
+        raise ValueError(f"Imagem não pode ser carregada: {caminho}")
+    return imagem
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='Convolução em ladrilhos com entrada e saída mapeadas em memória')
+    parser.add_argument('entrada', help='Imagem de entrada (.npy é mapeado em memória)')
+    parser.add_argument('saida', help='Imagem de saída (.npy é escrito direto no disco)')
+    parser.add_argument('-n', '--nucleo', default='nucleo.txt', help='Arquivo do núcleo (NxN, N ímpar)')
+    parser.add_argument('-b', '--borda', default='ignorar', choices=list(MODOS_BORDA))
+    parser.add_argument('-m', '--metodo', default='auto', choices=METODOS)
+    parser.add_argument('-c', '--cor', default='cinza', choices=list(MODOS_COR),
+                        help='cinza, cor (todos os canais) ou luminancia (só o Y do YCbCr)')
+    parser.add_argument('--ladrilho', type=int, default=LADRILHO, help='Lado dos ladrilhos, em pixels')
+    parser.add_argument('--threads', type=int, default=None, help='Threads (padrão: número de CPUs)')
+    args = parser.parse_args()
+
+    entrada = abrir_entrada(args.entrada, args.cor)
+    if args.saida.endswith('.npy'):
+        saida = np.lib.format.open_memmap(args.saida, mode='w+', dtype=np.uint8, shape=entrada.shape)
+    else:
+        saida = np.empty(entrada.shape, dtype=np.uint8)
+
+    inicio = time.perf_counter()
+    convolver_ladrilhos(entrada, ler_nucleo(args.nucleo), saida, args.borda, args.metodo,
+                        ladrilho=args.ladrilho, threads=args.threads, canais=MODOS_COR[args.cor][1])
+    segundos = time.perf_counter() - inicio
+
+    if isinstance(saida, np.memmap):
+        saida.flush()
+    else:
+        cv2.imwrite(args.saida, saida)
+    megapixels = entrada.shape[0] * entrada.shape[1] / 1e6
+    print(f"{entrada.shape[1]}x{entrada.shape[0]} em {segundos:.2f} s ({megapixels / segundos:.1f} MP/s)")
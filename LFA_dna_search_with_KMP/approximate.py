@@ -0,0 +1,83 @@
+# Busca aproximada com algoritmos bit-paralelos: cada bit de um inteiro
+# representa uma posição da subsequência, então cada base da sequência é
+# processada com poucas operações de palavra, em vez de um laço duplo.
+# Os inteiros do Python não têm limite de bits, então não há limite para
+# o tamanho da subsequência.
+
+
+def char_masks(subsequence):
+    # masks[c] tem o bit j ligado quando subsequence[j] == c
+    masks = {}
+    for j, base in enumerate(subsequence):
+        masks[base] = masks.get(base, 0) | (1 << j)
+    return masks
+
+
+def hamming_search(dna_sequence, subsequence, max_errors):
+    # Shift-And com até max_errors substituições (distância de Hamming).
+    # Retorna ([(posicao_inicial, distancia), ...], comparacoes)
+    sub_len = len(subsequence)
+    if sub_len == 0:
+        return [], 0
+    masks = char_masks(subsequence)
+    mask = (1 << sub_len) - 1
+    last = 1 << (sub_len - 1)
+    # states[d]: bit j ligado se subsequence[:j+1] casa com erro <= d
+    states = [0] * (max_errors + 1)
+    matches = []
+    comparisons = 0
+
+    for i, base in enumerate(dna_sequence):
+        eq = masks.get(base, 0)
+        previous = states[0]
+        states[0] = ((previous << 1) | 1) & eq
+        for d in range(1, max_errors + 1):
+            current = states[d]
+            # casa a base ou gasta um erro substituindo-a
+            states[d] = ((((current << 1) | 1) & eq) | ((previous << 1) | 1)) & mask
+            previous = current
+        comparisons += max_errors + 1
+        if i + 1 >= sub_len:
+            for d in range(max_errors + 1):
+                if states[d] & last:
+                    matches.append((i - sub_len + 1, d))
+                    break
+
+    return matches, comparisons
+
+
+def edit_distance_search(dna_sequence, subsequence, max_errors):
+    # Algoritmo de Myers (1999) para distância de edição.
+    # Retorna ([(posicao_final, distancia), ...], comparacoes), onde
+    # posicao_final é o índice da última base da ocorrência
+    sub_len = len(subsequence)
+    if sub_len == 0:
+        return [], 0
+    masks = char_masks(subsequence)
+    mask = (1 << sub_len) - 1
+    last = 1 << (sub_len - 1)
+    positive = mask  # deltas verticais +1
+    negative = 0  # deltas verticais -1
+    score = sub_len
+    matches = []
+    comparisons = 0
+
+    for i, base in enumerate(dna_sequence):
+        eq = masks.get(base, 0)
+        xv = eq | negative
+        xh = ((((eq & positive) + positive) & mask) ^ positive) | eq
+        horizontal_pos = negative | (~(xh | positive) & mask)
+        horizontal_neg = positive & xh
+        if horizontal_pos & last:
+            score += 1
+        elif horizontal_neg & last:
+            score -= 1
+        horizontal_pos = (horizontal_pos << 1) & mask
+        horizontal_neg = (horizontal_neg << 1) & mask
+        positive = horizontal_neg | (~(xv | horizontal_pos) & mask)
+        negative = horizontal_pos & xv
+        comparisons += 1
+        if score <= max_errors:
+            matches.append((i, score))
+
+    return matches, comparisons
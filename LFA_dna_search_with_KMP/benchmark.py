@@ -0,0 +1,185 @@
+# Benchmark reprodutível dos algoritmos de busca de DNA
+# Exemplo de uso:
+# $ python benchmark.py --sizes 1KB,1MB --patterns 4,32,1000 --json resultado.json --csv resultado.csv
+#
+# Os relatórios JSON/CSV podem ser comparados entre versões (diff).
+
+import csv
+import json
+import platform
+import random
+import time
+import tracemalloc
+from argparse import ArgumentParser
+
+from comparation import basic_search
+from kmp import kmp_search, kmp_search_parallel, aho_corasick_search
+from fm_index import FMIndex
+
+UNITS = {"B": 1, "KB": 1 << 10, "MB": 1 << 20, "GB": 1 << 30}
+
+
+def parse_size(text):
+    text = text.strip().upper()
+    for unit in ("GB", "MB", "KB", "B"):
+        if text.endswith(unit):
+            return int(float(text[:-len(unit)]) * UNITS[unit])
+    return int(text)
+
+
+# Cada byte aleatório vira uma base (os 2 bits mais baixos escolhem entre
+# A, C, G e T), sem criar uma string por base como rng.choices
+DNA_TABLE = bytes(b"ACGT"[byte & 3] for byte in range(256))
+
+
+def random_dna(size, rng):
+    return rng.randbytes(size).translate(DNA_TABLE).decode("ascii")
+
+
+def repetitive_dna(size):
+    # Pior caso da busca básica: texto só com "A" e padrão "AAA...C"
+    return "A" * size
+
+
+def make_pattern(kind, length, dna_sequence, rng):
+    if kind == "repetitive":
+        return "A" * (length - 1) + "C"
+    # Trecho do próprio texto, para garantir pelo menos uma ocorrência
+    start = rng.randrange(max(len(dna_sequence) - length, 0) + 1)
+    return dna_sequence[start:start + length]
+
+
+# Cada motor: (preparação do texto, busca). A preparação não entra no tempo.
+ENGINES = {
+    "basic": (None, basic_search),
+    "kmp": (None, kmp_search),
+    "kmp_count": (None, lambda dna, sub: kmp_search(dna, sub, mode="count", count_comparisons=False)),
+    "aho_corasick": (None, lambda dna, sub: aho_corasick_search(dna, [sub])),
+    "kmp_parallel": (None, kmp_search_parallel),
+    "fm_index": (FMIndex.build, lambda index, sub: index.search(sub)),
+}
+
+
+def measure(search, text, subsequence, with_memory):
+    start = time.perf_counter()
+    result, comparisons = search(text, subsequence)
+    if not isinstance(result, int) and not hasattr(result, "__len__"):
+        # Iterador (mode="iter"): a busca só acontece ao consumi-lo
+        result = sum(1 for _ in result)
+    seconds = time.perf_counter() - start
+
+    peak = None
+    if with_memory:
+        # Segunda execução só para medir o pico de memória (tracemalloc deixa
+        # o código mais lento, então não é usada para o tempo)
+        tracemalloc.start()
+        search(text, subsequence)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    occurrences = result if isinstance(result, int) else len(result)
+    return occurrences, comparisons, seconds, peak
+
+
+def run_benchmark(sizes, pattern_lengths, engines, kinds=("random", "repetitive"),
+                  seed=42, with_memory=True, budget=5 * 10 ** 7, fm_budget=4 << 20):
+    rng = random.Random(seed)
+    results = []
+    for kind in kinds:
+        for size in sizes:
+            dna_sequence = random_dna(size, rng) if kind == "random" else repetitive_dna(size)
+            prepared = {}
+            for pattern_length in pattern_lengths:
+                if pattern_length > size:
+                    continue
+                subsequence = make_pattern(kind, pattern_length, dna_sequence, rng)
+                for name in engines:
+                    prepare, search = ENGINES[name]
+                    # A busca básica é O(n*m); acima do orçamento ela é pulada
+                    if name == "basic" and size * pattern_length > budget:
+                        print(f"pulando basic: {kind} {size} B x {pattern_length}")
+                        continue
+                    # A construção do índice FM é lenta (Python puro); acima
+                    # do orçamento de tamanho do texto ela é pulada
+                    if name == "fm_index" and size > fm_budget:
+                        print(f"pulando fm_index: {kind} {size} B")
+                        continue
+                    if prepare is not None and name not in prepared:
+                        prepared[name] = prepare(dna_sequence)
+                    text = prepared.get(name, dna_sequence)
+                    occurrences, comparisons, seconds, peak = measure(search, text, subsequence, with_memory)
+                    row = {
+                        "engine": name,
+                        "text_kind": kind,
+                        "text_size": size,
+                        "pattern_length": pattern_length,
+                        "occurrences": occurrences,
+                        "comparisons": comparisons,
+                        "seconds": round(seconds, 6),
+                        "peak_bytes": peak,
+                        "mb_per_s": round(size / (1 << 20) / seconds, 3) if seconds > 0 else None,
+                    }
+                    results.append(row)
+                    print(f"{name:>13} {kind:>10} {size:>11} B  m={pattern_length:<5} "
+                          f"{seconds:9.4f} s  {row['mb_per_s']} MB/s")
+    return results
+
+
+def write_json(results, path, seed):
+    report = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "seed": seed,
+        "results": results,
+    }
+    with open(path, "w") as file:
+        json.dump(report, file, indent=2)
+
+
+def write_csv(results, path):
+    with open(path, "w", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=list(results[0]) if results else [])
+        writer.writeheader()
+        writer.writerows(results)
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Benchmark dos algoritmos de busca de DNA")
+    parser.add_argument("--sizes", default="1KB,64KB",
+                        help="Tamanhos do texto separados por vírgula (ex.: 1KB,1MB,1GB)")
+    parser.add_argument("--patterns", default="4,32,1000",
+                        help="Tamanhos da subsequência separados por vírgula")
+    parser.add_argument("--engines", default=",".join(ENGINES),
+                        help="Motores a comparar: " + ", ".join(ENGINES))
+    parser.add_argument("--kinds", default="random,repetitive",
+                        help="Tipos de texto: random, repetitive")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--budget", type=float, default=5e7,
+                        help="Limite de tamanho x padrão para rodar a busca básica")
+    parser.add_argument("--fm-budget", default="4MB",
+                        help="Tamanho máximo do texto para construir o índice FM (ex.: 4MB)")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="Não mede o pico de memória (mais rápido)")
+    parser.add_argument("--json", help="Arquivo JSON de saída")
+    parser.add_argument("--csv", help="Arquivo CSV de saída")
+    args = parser.parse_args()
+
+    engines = [name.strip() for name in args.engines.split(",")]
+    unknown = [name for name in engines if name not in ENGINES]
+    if unknown:
+        parser.error(f"motores desconhecidos: {', '.join(unknown)}")
+
+    results = run_benchmark(
+        [parse_size(size) for size in args.sizes.split(",")],
+        [int(length) for length in args.patterns.split(",")],
+        engines,
+        kinds=[kind.strip() for kind in args.kinds.split(",")],
+        seed=args.seed,
+        with_memory=not args.no_memory,
+        budget=args.budget,
+        fm_budget=parse_size(args.fm_budget),
+    )
+    if args.json:
+        write_json(results, args.json, args.seed)
+    if args.csv:
+        write_csv(results, args.csv)
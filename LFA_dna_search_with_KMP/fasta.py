@@ -0,0 +1,45 @@
+def read_sequence_blocks(file_path, block_size=1 << 20):
+    # Lê um arquivo FASTA (ou texto puro) em blocos de tamanho fixo e gera
+    # pares (registro, trecho). Cabeçalhos ">..." iniciam um novo registro e
+    # geram um trecho vazio; quebras de linha são removidas dos trechos.
+    # Em texto puro o registro é None.
+    record = None
+    header = []
+    in_header = False
+    at_line_start = True
+
+    with open(file_path, "r") as file:
+        while True:
+            block = file.read(block_size)
+            if not block:
+                break
+            pos = 0
+            while pos < len(block):
+                if in_header:
+                    end = block.find("\n", pos)
+                    if end == -1:
+                        header.append(block[pos:])
+                        break
+                    header.append(block[pos:end])
+                    record = "".join(header).strip()
+                    header = []
+                    in_header = False
+                    at_line_start = True
+                    pos = end + 1
+                    yield record, ""
+                elif at_line_start and block[pos] == ">":
+                    in_header = True
+                    pos += 1
+                else:
+                    end = block.find("\n>", pos)
+                    end = len(block) if end == -1 else end + 1
+                    chunk = block[pos:end]
+                    at_line_start = chunk.endswith("\n")
+                    pos = end
+                    chunk = "".join(chunk.split()).upper()
+                    if chunk:
+                        yield record, chunk
+
+    # Cabeçalho na última linha, sem quebra de linha no final
+    if in_header:
+        yield "".join(header).strip(), ""
@@ -0,0 +1,246 @@
+# Índice FM (suffix array + BWT) para consultas repetidas em um genoma fixo
+# Exemplo de uso:
+# $ python fm_index.py build genoma.txt genoma.fmi
+# $ python fm_index.py count genoma.fmi GATTACA
+# $ python fm_index.py locate genoma.fmi GATTACA
+
+import mmap
+import struct
+from array import array
+from argparse import ArgumentParser
+from itertools import chain, repeat
+from operator import add
+
+# '$' (fim da sequência) é o menor símbolo
+FM_CODES = {"$": 0, "A": 1, "C": 2, "G": 3, "T": 4}
+SIGMA = len(FM_CODES)
+
+MAGIC = b"FMI2"
+# 32 bytes, para que as partes seguintes fiquem alinhadas em 8 bytes
+HEADER = struct.Struct("<4sQQ1s11x")
+CHECKPOINT = 64
+# Símbolos usados na primeira ordenação (SIGMA ** PREFIX < 2 ** 32)
+PREFIX = 13
+
+
+def encode_text(dna_sequence):
+    try:
+        return [FM_CODES[base] for base in dna_sequence] + [FM_CODES["$"]]
+    except KeyError as e:
+        raise ValueError(f"Caractere inválido na sequência: {e.args[0]!r}") from None
+
+
+def rank_sorted(suffix_array, keys, rank):
+    # Ranks densos a partir das chaves, percorrendo os sufixos já ordenados;
+    # devolve o maior rank
+    previous_key = keys[suffix_array[0]]
+    current_rank = 0
+    for i in suffix_array:
+        key = keys[i]
+        if key != previous_key:
+            current_rank += 1
+            previous_key = key
+        rank[i] = current_rank
+    return current_rank
+
+
+def build_suffix_array(codes):
+    # Duplicação de prefixos: ordena os sufixos pelos 2k primeiros símbolos
+    # usando os ranks calculados para os k primeiros. Chaves, ranks e o
+    # próprio suffix array ficam em arrays (8 ou 4 bytes por posição, em vez
+    # de um objeto int por posição)
+    n = len(codes)
+    typecode = "I" if n < 2 ** 32 else "Q"
+
+    # Primeira ordenação pelos PREFIX primeiros símbolos de cada sufixo,
+    # lidos como um número na base SIGMA (depois do '$' vêm zeros)
+    keys = array("Q", bytes(8 * n))
+    high = SIGMA ** (PREFIX - 1)
+    value = 0
+    for i in range(n - 1, -1, -1):
+        value = value // SIGMA + codes[i] * high
+        keys[i] = value
+    suffix_array = array(typecode, sorted(range(n), key=keys.__getitem__))
+    rank = array(typecode, bytes(n * suffix_array.itemsize))
+    if rank_sorted(suffix_array, keys, rank) == n - 1:
+        return suffix_array
+
+    # Chave de cada sufixo: (rank[i], rank[i + k] + 1) em um único inteiro,
+    # com 0 para quem passa do fim
+    base = n + 1
+    k = PREFIX
+    while True:
+        keys = array("Q", map(add, map(base.__mul__, rank),
+                              chain(map((1).__add__, rank[k:]), repeat(0, min(k, n)))))
+        suffix_array = array(typecode, sorted(suffix_array, key=keys.__getitem__))
+        if rank_sorted(suffix_array, keys, rank) == n - 1:
+            return suffix_array
+        k *= 2
+
+
+def pad8(size):
+    return (size + 7) & ~7
+
+
+class FMIndex:
+
+    def __init__(self, length, bwt, counts, checkpoints, suffix_array):
+        self.length = length  # inclui o '$'
+        self.bwt = bwt
+        self.counts = counts  # counts[c] = quantidade de símbolos menores que c
+        self.checkpoints = checkpoints  # ocorrências de cada símbolo a cada CHECKPOINT posições
+        self.suffix_array = suffix_array
+        self._file = None
+        self._buffer = None
+        self._view = None
+
+    @classmethod
+    def build(cls, dna_sequence):
+        codes = encode_text(dna_sequence)
+        length = len(codes)
+        suffix_array = build_suffix_array(codes)
+        bwt = bytes(codes[i - 1] for i in suffix_array)
+
+        typecode = "I" if length < 2 ** 32 else "Q"
+        totals = [0] * SIGMA
+        checkpoints = array(typecode)
+        for i, code in enumerate(bwt):
+            if i % CHECKPOINT == 0:
+                checkpoints.extend(totals)
+            totals[code] += 1
+        checkpoints.extend(totals)
+
+        counts = array("Q", [0] * (SIGMA + 1))
+        for c in range(SIGMA):
+            counts[c + 1] = counts[c] + totals[c]
+
+        return cls(length, bwt, counts, checkpoints, suffix_array)
+
+    def save(self, index_path):
+        # Layout: cabeçalho | counts | bwt | checkpoints | suffix array,
+        # cada parte alinhada em 8 bytes para poder ser mapeada com mmap
+        typecode = self.suffix_array.typecode
+        with open(index_path, "wb") as file:
+            file.write(HEADER.pack(MAGIC, self.length, len(self.checkpoints), typecode.encode()))
+            file.write(self.counts.tobytes())
+            file.write(self.bwt)
+            file.write(bytes(pad8(self.length) - self.length))
+            file.write(self.checkpoints.tobytes())
+            file.write(bytes(pad8(len(self.checkpoints) * self.checkpoints.itemsize)
+                             - len(self.checkpoints) * self.checkpoints.itemsize))
+            file.write(self.suffix_array.tobytes())
+
+    @classmethod
+    def open(cls, index_path):
+        file = open(index_path, "rb")
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, length, total_checkpoints, typecode = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            buffer.close()
+            file.close()
+            raise ValueError("Arquivo não é um índice FM.")
+        typecode = typecode.decode()
+        itemsize = array(typecode).itemsize
+        view = memoryview(buffer)
+
+        offset = HEADER.size
+        counts = view[offset:offset + (SIGMA + 1) * 8].cast("Q")
+        offset += (SIGMA + 1) * 8
+        bwt = view[offset:offset + length]
+        offset += pad8(length)
+        checkpoints = view[offset:offset + total_checkpoints * itemsize].cast(typecode)
+        offset += pad8(total_checkpoints * itemsize)
+        suffix_array = view[offset:offset + length * itemsize].cast(typecode)
+
+        index = cls(length, bwt, counts, checkpoints, suffix_array)
+        index._file = file
+        index._buffer = buffer
+        index._view = view
+        return index
+
+    def close(self):
+        if self._file is not None:
+            for part in (self.counts, self.bwt, self.checkpoints, self.suffix_array):
+                part.release()
+            self._view.release()
+            self._buffer.close()
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def occ(self, code, i):
+        # Quantidade de 'code' em bwt[0:i]
+        block = i // CHECKPOINT
+        start = block * CHECKPOINT
+        return self.checkpoints[block * SIGMA + code] + bytes(self.bwt[start:i]).count(code)
+
+    def backward_search(self, subsequence):
+        # Retorna o intervalo [lo, hi) do suffix array e o número de passos
+        lo, hi = 0, self.length
+        steps = 0
+        for base in reversed(subsequence):
+            code = FM_CODES.get(base)
+            if code is None or code == 0:
+                return 0, 0, steps
+            steps += 1
+            lo = self.counts[code] + self.occ(code, lo)
+            hi = self.counts[code] + self.occ(code, hi)
+            if lo >= hi:
+                return 0, 0, steps
+        return lo, hi, steps
+
+    def count(self, subsequence):
+        lo, hi, _ = self.backward_search(subsequence)
+        return hi - lo
+
+    def locate(self, subsequence):
+        lo, hi, _ = self.backward_search(subsequence)
+        return sorted(self.suffix_array[lo:hi])
+
+    def search(self, subsequence):
+        # Mesmo formato de kmp_search: (posições, comparações)
+        lo, hi, steps = self.backward_search(subsequence)
+        return sorted(self.suffix_array[lo:hi]), steps
+
+
+def fm_search(index, subsequence):
+    return index.search(subsequence)
+
+
+def read_reference(file_path):
+    # Junta todos os trechos do arquivo (FASTA ou texto) em uma única sequência
+    from fasta import read_sequence_blocks
+    return "".join(chunk for _, chunk in read_sequence_blocks(file_path))
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Índice FM para buscas repetidas de DNA")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = subparsers.add_parser("build", help="Constrói o índice a partir do genoma")
+    build_parser.add_argument("reference", help="Arquivo FASTA ou texto com o genoma")
+    build_parser.add_argument("index", help="Arquivo de saída do índice")
+
+    for command in ("count", "locate"):
+        query_parser = subparsers.add_parser(command)
+        query_parser.add_argument("index", help="Arquivo do índice")
+        query_parser.add_argument("subsequence", help="Subsequência a ser buscada")
+
+    args = parser.parse_args()
+
+    if args.command == "build":
+        index = FMIndex.build(read_reference(args.reference))
+        index.save(args.index)
+        print("Índice salvo em", args.index, "com", index.length - 1, "bases")
+    else:
+        with FMIndex.open(args.index) as index:
+            if args.command == "count":
+                print(index.count(args.subsequence))
+            else:
+                positions = index.locate(args.subsequence)
+                print(*positions, sep="\n")
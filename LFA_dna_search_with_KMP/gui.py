@@ -1,26 +1,55 @@
+import threading
 import tkinter as tk
 from tkinter import messagebox, filedialog
-from kmp import kmp_search, compute_lps_array
+from kmp import kmp_search, kmp_search_file, kmp_trace, aho_corasick_search
 from comparation import basic_search
+from packed_dna import PackedDNA, encode_pattern
 
 def search_sequences():
-    # Validar entrada de DNA e subsequência para conter apenas C, T, A, G
-    valid_chars = {"C", "T", "A", "G"}
-    if not set(dna_entry.get()).issubset(valid_chars) or not set(sub_entry.get()).issubset(valid_chars):
-        messagebox.showerror("Erro de entrada", "As sequências devem conter apenas as letras C, T, A e G.")
-        return
-    
+    # A validação (apenas C, T, A, G) acontece uma única vez, durante a codificação em 2 bits
     dna_sequence = dna_entry.get()
     subsequence = sub_entry.get()
+    # Várias sondas podem ser informadas separadas por vírgula (entradas
+    # vazias, como em "ACG,", são ignoradas)
+    probes = [probe.strip() for probe in subsequence.split(",") if probe.strip()]
+    try:
+        if not probes:
+            raise ValueError("Nenhuma subsequência informada")
+        packed_dna = PackedDNA.from_string(dna_sequence)
+        packed_probes = [encode_pattern(probe) for probe in probes]
+    except ValueError:
+        messagebox.showerror("Erro de entrada", "As sequências devem conter apenas as letras C, T, A e G.")
+        return
+
+    if len(probes) > 1:
+        search_probes(packed_dna, probes, packed_probes)
+        return
 
-    basic_positions, basic_comparisons = basic_search(dna_sequence, subsequence)
-    kmp_positions, kmp_comparisons = kmp_search(dna_sequence, subsequence)
+    packed_sub = packed_probes[0]
+    basic_positions, basic_comparisons = basic_search(packed_dna, packed_sub)
+    kmp_positions, kmp_comparisons = kmp_search(packed_dna, packed_sub)
 
     result_text = f"Basic Search:\nPositions: {basic_positions}\nComparisons: {basic_comparisons}\n\n"
     result_text += f"KMP Search:\nPositions: {kmp_positions}\nComparisons: {kmp_comparisons}\n"
     
     result_label.config(text=result_text)
-    visualize_kmp(dna_sequence, subsequence)
+    visualize_kmp(dna_sequence, probes[0])
+
+def search_probes(packed_dna, probes, packed_probes):
+    # Compara N buscas KMP (uma por sonda) com uma única passada do Aho-Corasick
+    basic_comparisons = 0
+    kmp_comparisons = 0
+    for packed_sub in packed_probes:
+        basic_comparisons += basic_search(packed_dna, packed_sub)[1]
+        kmp_comparisons += kmp_search(packed_dna, packed_sub)[1]
+    matches, ac_comparisons = aho_corasick_search(packed_dna, packed_probes)
+
+    hits = [f"{probes[pattern_id]}@{position}" for pattern_id, position in matches]
+    result_text = f"Basic Search ({len(probes)} passes):\nComparisons: {basic_comparisons}\n\n"
+    result_text += f"KMP Search ({len(probes)} passes):\nComparisons: {kmp_comparisons}\n\n"
+    result_text += f"Aho-Corasick (1 pass):\nMatches: {hits}\nComparisons: {ac_comparisons}\n"
+
+    result_label.config(text=result_text)
 
 def load_dna_from_file():
     # Função para carregar sequência de DNA de um arquivo
@@ -34,39 +63,125 @@ def load_dna_from_file():
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao ler o arquivo: {e}")
 
+def search_in_file():
+    # Busca em fluxo: o arquivo (FASTA ou texto) é lido em blocos, sem passar pelo campo de texto
+    subsequence = sub_entry.get()
+    if not subsequence or not set(subsequence).issubset({"C", "T", "A", "G"}):
+        messagebox.showerror("Erro de entrada", "A subsequência deve conter apenas as letras C, T, A e G.")
+        return
+    file_path = filedialog.askopenfilename(filetypes=[("FASTA files", "*.fa *.fasta *.fna"), ("Text files", "*.txt")])
+    if file_path:
+        # A leitura do arquivo roda em uma thread; a janela só consulta o
+        # resultado com after(), então não congela em arquivos grandes
+        scan = {"done": False, "text": None, "error": None}
+        threading.Thread(target=scan_file, args=(file_path, subsequence, scan), daemon=True).start()
+        stream_button.config(state=tk.DISABLED)
+        result_label.config(text=f"KMP Search (streaming):\nLendo {file_path}...")
+        root.after(100, show_scan, scan)
+
+def scan_file(file_path, subsequence, scan):
+    try:
+        total = 0
+        shown = []
+        for record, position in kmp_search_file(file_path, subsequence):
+            total += 1
+            if len(shown) < 50:
+                shown.append(f"{record}:{position}" if record is not None else str(position))
+        result_text = f"KMP Search (streaming):\nOccurrences: {total}\nPositions: {', '.join(shown)}"
+        if total > len(shown):
+            result_text += ", ..."
+        scan["text"] = result_text
+    except Exception as e:
+        scan["error"] = e
+    scan["done"] = True
+
+def show_scan(scan):
+    if not scan["done"]:
+        root.after(100, show_scan, scan)
+        return
+    stream_button.config(state=tk.NORMAL)
+    if scan["error"] is not None:
+        result_label.config(text="")
+        messagebox.showerror("Erro", f"Erro ao ler o arquivo: {scan['error']}")
+    else:
+        result_label.config(text=scan["text"])
+
+# Estado da visualização: o traço do KMP é calculado em uma thread e a
+# animação avança com after(), sem bloquear a janela
+WINDOW = 60
+visual = {"dna": "", "sub": "", "trace": [], "done": False, "step": 0,
+          "playing": False, "job": None, "generation": 0}
+
+def compute_trace(generation, dna_sequence, subsequence, trace):
+    for step in kmp_trace(dna_sequence, subsequence):
+        if visual["generation"] != generation:
+            return  # Uma nova busca começou; abandona este traço
+        trace.append(step)
+    if visual["generation"] == generation:
+        visual["done"] = True
+
 def visualize_kmp(dna_sequence, subsequence):
-    lps = compute_lps_array(subsequence)
-    i = j = 0
-    state_canvas.delete("all")
-    
-    while i < len(dna_sequence):
-        draw_state(dna_sequence, subsequence, i, j)
-        state_canvas.update()
-        state_canvas.after(500)  # Pause for visualization
-        
-        if subsequence[j] == dna_sequence[i]:
-            i += 1
-            j += 1
-        
-        if j == len(subsequence):
-            j = lps[j - 1]
-        elif i < len(dna_sequence) and subsequence[j] != dna_sequence[i]:
-            if j != 0:
-                j = lps[j - 1]
-            else:
-                i += 1
+    if visual["job"] is not None:
+        state_canvas.after_cancel(visual["job"])
+    visual["generation"] += 1
+    visual.update(dna=dna_sequence, sub=subsequence, trace=[], done=False, step=0, playing=True, job=None)
+    threading.Thread(target=compute_trace,
+                     args=(visual["generation"], dna_sequence, subsequence, visual["trace"]),
+                     daemon=True).start()
+    play_button.config(text="Pause")
+    play_step()
+
+def play_step():
+    visual["job"] = None
+    trace = visual["trace"]
+    seek_scale.config(to=max(len(trace) - 1, 0))
+    if visual["step"] < len(trace):
+        draw_state(visual["dna"], visual["sub"], *trace[visual["step"]])
+        seek_scale.set(visual["step"])
+        if visual["playing"] and visual["step"] + 1 < len(trace):
+            visual["step"] += 1
+    if visual["playing"] and (visual["step"] + 1 < len(trace) or not visual["done"]):
+        visual["job"] = state_canvas.after(speed_scale.get(), play_step)
+    elif visual["done"] and visual["step"] + 1 >= len(trace):
+        visual["playing"] = False
+        play_button.config(text="Play")
+
+def toggle_play():
+    visual["playing"] = not visual["playing"]
+    play_button.config(text="Pause" if visual["playing"] else "Play")
+    if visual["playing"] and visual["job"] is None:
+        play_step()
+
+def seek(value):
+    step = int(float(value))
+    if step != visual["step"] and step < len(visual["trace"]):
+        visual["step"] = step
+        draw_state(visual["dna"], visual["sub"], *visual["trace"][step])
 
 def draw_state(dna_sequence, subsequence, i, j):
-    state_canvas.delete("all")
-    state_canvas.create_text(10, 10, anchor=tk.NW, text=f"DNA Sequence: {dna_sequence}", font=("Courier", 16))
-    state_canvas.create_text(10, 40, anchor=tk.NW, text=f"Subsequence: {subsequence}", font=("Courier", 16))
-    state_canvas.create_text(10, 70, anchor=tk.NW, text=f"Comparing index i: {i} (DNA) with index j: {j} (Subsequence)", font=("Courier", 14))
+    # Mostra só uma janela da sequência em volta de i, atualizando os itens
+    # do canvas já criados em vez de apagar e redesenhar tudo
+    start = max(0, i - WINDOW // 2)
+    end = min(len(dna_sequence), start + WINDOW)
+    offset = i - j  # posição da subsequência alinhada com a sequência
 
-    dna_highlight = dna_sequence[:i] + "[" + dna_sequence[i:i+1] + "]" + dna_sequence[i+1:]
-    sub_highlight = " " * j + "[" + subsequence[j:j+1] + "]" + subsequence[j+1:]
-    
-    state_canvas.create_text(10, 100, anchor=tk.NW, text=dna_highlight, font=("Courier", 16), fill="blue")
-    state_canvas.create_text(10, 130, anchor=tk.NW, text=sub_highlight, font=("Courier", 16), fill="red")
+    dna_row = []
+    sub_row = []
+    for pos in range(start, end):
+        k = pos - offset
+        sub_char = subsequence[k] if 0 <= k < len(subsequence) else " "
+        if pos == i:
+            dna_row.append("[" + dna_sequence[pos] + "]")
+            sub_row.append("[" + sub_char + "]")
+        else:
+            dna_row.append(dna_sequence[pos])
+            sub_row.append(sub_char)
+
+    state_canvas.itemconfig(canvas_items["dna"], text=f"DNA Sequence: {len(dna_sequence)} bases, showing {start}..{end - 1}")
+    state_canvas.itemconfig(canvas_items["sub"], text=f"Subsequence: {subsequence}")
+    state_canvas.itemconfig(canvas_items["index"], text=f"Comparing index i: {i} (DNA) with index j: {j} (Subsequence)")
+    state_canvas.itemconfig(canvas_items["dna_highlight"], text="".join(dna_row))
+    state_canvas.itemconfig(canvas_items["sub_highlight"], text="".join(sub_row))
 
 root = tk.Tk()
 root.title("DNA Sequence Search")
@@ -85,10 +200,34 @@ search_button.grid(row=2, column=0, columnspan=2, pady=20)
 load_button = tk.Button(root, text="Load DNA from File", command=load_dna_from_file)
 load_button.grid(row=3, column=0, columnspan=2, pady=10)
 
+stream_button = tk.Button(root, text="Search in File (streaming)", command=search_in_file)
+stream_button.grid(row=4, column=0, columnspan=2, pady=10)
+
 result_label = tk.Label(root, text="", justify=tk.LEFT)
-result_label.grid(row=4, column=0, columnspan=2, padx=10, pady=10)
+result_label.grid(row=5, column=0, columnspan=2, padx=10, pady=10)
 
 state_canvas = tk.Canvas(root, width=800, height=200, bg="white")
-state_canvas.grid(row=5, column=0, columnspan=2, padx=10, pady=10)
+state_canvas.grid(row=6, column=0, columnspan=2, padx=10, pady=10)
+
+canvas_items = {
+    "dna": state_canvas.create_text(10, 10, anchor=tk.NW, font=("Courier", 16)),
+    "sub": state_canvas.create_text(10, 40, anchor=tk.NW, font=("Courier", 16)),
+    "index": state_canvas.create_text(10, 70, anchor=tk.NW, font=("Courier", 14)),
+    "dna_highlight": state_canvas.create_text(10, 100, anchor=tk.NW, font=("Courier", 16), fill="blue"),
+    "sub_highlight": state_canvas.create_text(10, 130, anchor=tk.NW, font=("Courier", 16), fill="red"),
+}
+
+controls = tk.Frame(root)
+controls.grid(row=7, column=0, columnspan=2, padx=10, pady=10)
+
+play_button = tk.Button(controls, text="Play", width=6, command=toggle_play)
+play_button.pack(side=tk.LEFT, padx=5)
+
+seek_scale = tk.Scale(controls, label="Step", from_=0, to=0, orient=tk.HORIZONTAL, length=400, command=seek)
+seek_scale.pack(side=tk.LEFT, padx=5)
+
+speed_scale = tk.Scale(controls, label="Delay (ms)", from_=10, to=1000, orient=tk.HORIZONTAL, length=200)
+speed_scale.set(500)
+speed_scale.pack(side=tk.LEFT, padx=5)
 
 root.mainloop()
@@ -1,3 +1,9 @@
+import os
+from array import array
+from collections import deque
+from itertools import islice
+from multiprocessing import Pool, shared_memory
+
 def compute_lps_array(subsequence):
     length = 0
     lps = [0] * len(subsequence)
@@ -17,11 +23,29 @@ def compute_lps_array(subsequence):
 
     return lps
 
-def kmp_search(dna_sequence, subsequence):
+# Modos de resultado de kmp_search
+RESULT_MODES = ("list", "count", "first", "array", "iter")
+
+def kmp_iter(dna_sequence, subsequence):
+    # Gera as posições sob demanda, sem o contador de comparações
+    sub_len = len(subsequence)
+    lps = compute_lps_array(subsequence)
+    j = 0
+    for i, base in enumerate(dna_sequence):
+        while j > 0 and base != subsequence[j]:
+            j = lps[j - 1]
+        if base == subsequence[j]:
+            j += 1
+        if j == sub_len:
+            yield i - sub_len + 1
+            j = lps[j - 1]
+
+def kmp_iter_counted(dna_sequence, subsequence, stats):
+    # Mesmo laço da versão original; stats[0] guarda as comparações feitas
+    # até o momento (atualizado a cada ocorrência e no final)
     dna_len = len(dna_sequence)
     sub_len = len(subsequence)
     lps = compute_lps_array(subsequence)
-    positions = []
     comparisons = 0
 
     i = 0
@@ -33,7 +57,8 @@ def kmp_search(dna_sequence, subsequence):
             j += 1
 
         if j == sub_len:
-            positions.append(i - j)
+            stats[0] = comparisons
+            yield i - j
             j = lps[j - 1]
         elif i < dna_len and subsequence[j] != dna_sequence[i]:
             if j != 0:
@@ -41,4 +66,215 @@ def kmp_search(dna_sequence, subsequence):
             else:
                 i += 1
 
+    stats[0] = comparisons
+
+def kmp_search(dna_sequence, subsequence, mode="list", limit=None, count_comparisons=True):
+    # mode: "list" (padrão), "count" (só a quantidade), "first" (as 'limit'
+    # primeiras), "array" (array('q') compacto) ou "iter" (iterador; as
+    # comparações vêm como None). Com count_comparisons=False as comparações
+    # também vêm como None. Sempre retorna (resultado, comparações)
+    if mode not in RESULT_MODES:
+        raise ValueError(f"Modo de resultado inválido: {mode!r}")
+    if mode == "iter":
+        return kmp_iter(dna_sequence, subsequence), None
+
+    stats = [None]
+    if count_comparisons:
+        stats[0] = 0
+        positions = kmp_iter_counted(dna_sequence, subsequence, stats)
+    else:
+        positions = kmp_iter(dna_sequence, subsequence)
+
+    if mode == "list":
+        result = list(positions)
+    elif mode == "count":
+        result = sum(1 for _ in positions)
+    elif mode == "first":
+        result = list(islice(positions, limit))
+        positions.close()
+    else:
+        result = array("q", positions)
+
+    return result, stats[0]
+
+def kmp_trace(dna_sequence, subsequence):
+    # Passos (i, j) da busca KMP, na ordem em que a visualização os mostra
+    lps = compute_lps_array(subsequence)
+    i = j = 0
+    while i < len(dna_sequence):
+        yield i, j
+
+        if subsequence[j] == dna_sequence[i]:
+            i += 1
+            j += 1
+
+        if j == len(subsequence):
+            j = lps[j - 1]
+        elif i < len(dna_sequence) and subsequence[j] != dna_sequence[i]:
+            if j != 0:
+                j = lps[j - 1]
+            else:
+                i += 1
+
+def scan_block(block, subsequence, lps, j, offset):
+    # Percorre um bloco continuando do estado j; devolve as posições
+    # encontradas no bloco e o novo estado
+    sub_len = len(subsequence)
+    positions = []
+    for k, base in enumerate(block):
+        while j > 0 and base != subsequence[j]:
+            j = lps[j - 1]
+        if base == subsequence[j]:
+            j += 1
+        if j == sub_len:
+            positions.append(offset + k - sub_len + 1)
+            j = lps[j - 1]
+    return positions, j
+
+def kmp_search_stream(blocks, subsequence):
+    # Versão em fluxo: recebe os blocos da sequência um de cada vez e mantém
+    # o estado j do KMP entre eles, gerando as posições sob demanda
+    lps = compute_lps_array(subsequence)
+    offset = 0
+    j = 0
+    for block in blocks:
+        positions, j = scan_block(block, subsequence, lps, j, offset)
+        yield from positions
+        offset += len(block)
+
+def kmp_search_file(file_path, subsequence, block_size=1 << 20):
+    # Busca em um arquivo FASTA (vários registros) ou texto puro sem montar a
+    # sequência inteira. Gera (registro, posição), com a posição relativa ao
+    # início do registro; ocorrências nunca atravessam dois registros
+    from fasta import read_sequence_blocks
+
+    lps = compute_lps_array(subsequence)
+    record = None
+    offset = 0
+    j = 0
+    for block_record, block in read_sequence_blocks(file_path, block_size):
+        if not block:
+            record, offset, j = block_record, 0, 0
+            continue
+        positions, j = scan_block(block, subsequence, lps, j, offset)
+        for position in positions:
+            yield record, position
+        offset += len(block)
+
+def build_aho_corasick(patterns):
+    # Autômato de Aho-Corasick: uma trie com todos os padrões mais a função de
+    # falha (a mesma ideia do array LPS, generalizada para vários padrões)
+    goto = [{}]
+    fail = [0]
+    output = [[]]
+
+    for pattern_id, pattern in enumerate(patterns):
+        if not len(pattern):
+            continue
+        node = 0
+        for base in pattern:
+            child = goto[node].get(base)
+            if child is None:
+                goto.append({})
+                fail.append(0)
+                output.append([])
+                child = len(goto) - 1
+                goto[node][base] = child
+            node = child
+        output[node].append(pattern_id)
+
+    queue = deque(goto[0].values())
+    while queue:
+        node = queue.popleft()
+        for base, child in goto[node].items():
+            queue.append(child)
+            state = fail[node]
+            while state != 0 and base not in goto[state]:
+                state = fail[state]
+            fail[child] = goto[state].get(base, 0) if node != 0 else 0
+            output[child] = output[child] + output[fail[child]]
+
+    return goto, fail, output
+
+def aho_corasick_search(dna_sequence, patterns):
+    # Busca todos os padrões em uma única passada pela sequência.
+    # Retorna ([(id_do_padrao, posicao), ...], comparacoes)
+    goto, fail, output = build_aho_corasick(patterns)
+    matches = []
+    comparisons = 0
+
+    node = 0
+    for i, base in enumerate(dna_sequence):
+        comparisons += 1
+        while node != 0 and base not in goto[node]:
+            node = fail[node]
+            comparisons += 1
+        node = goto[node].get(base, 0)
+        for pattern_id in output[node]:
+            matches.append((pattern_id, i - len(patterns[pattern_id]) + 1))
+
+    return matches, comparisons
+
+# Complemento das bases, tanto em texto quanto nos códigos de 2 bits de packed_dna
+COMPLEMENT = {"A": "T", "C": "G", "G": "C", "T": "A", 0: 3, 1: 2, 2: 1, 3: 0}
+
+def reverse_complement(subsequence):
+    complement = [COMPLEMENT[base] for base in reversed(subsequence)]
+    return "".join(complement) if isinstance(subsequence, str) else complement
+
+def dual_strand_search(dna_sequence, subsequence):
+    # Busca a subsequência e o seu reverso complementar em uma única passada,
+    # usando o autômato de Aho-Corasick com os dois padrões.
+    # Retorna ([(posicao, fita), ...], comparacoes), com fita "+" ou "-";
+    # padrões palindrômicos aparecem nas duas fitas
+    strands = ("+", "-")
+    matches, comparisons = aho_corasick_search(dna_sequence, [subsequence, reverse_complement(subsequence)])
+    return [(position, strands[pattern_id]) for pattern_id, position in matches], comparisons
+
+def search_shard(task):
+    # Executado em cada processo: conecta na memória compartilhada (sem copiar
+    # a sequência) e busca no trecho [start, end) mais a sobreposição
+    name, dna_len, subsequence, start, end = task
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        shard = shm.buf[start:min(end + len(subsequence) - 1, dna_len)]
+        positions, comparisons = kmp_search(shard, subsequence)
+        shard.release()
+    finally:
+        shm.close()
+    # Só fica com as ocorrências que começam dentro do próprio trecho; as da
+    # sobreposição pertencem ao trecho seguinte
+    return [start + p for p in positions if start + p < end], comparisons
+
+def kmp_search_parallel(dna_sequence, subsequence, processes=None, shards_per_process=4):
+    # Divide a sequência em trechos com sobreposição de len(subsequence)-1
+    # e roda o KMP em paralelo sobre uma única cópia em memória compartilhada
+    processes = processes or os.cpu_count() or 1
+    dna_bytes = dna_sequence.encode("ascii") if isinstance(dna_sequence, str) else bytes(dna_sequence)
+    sub_bytes = subsequence.encode("ascii") if isinstance(subsequence, str) else bytes(subsequence)
+    dna_len = len(dna_bytes)
+    if dna_len < len(sub_bytes) or not sub_bytes:
+        return [], 0
+
+    total_shards = max(1, min(processes * shards_per_process, dna_len // max(len(sub_bytes), 1)))
+    shard_size = -(-dna_len // total_shards)
+
+    shm = shared_memory.SharedMemory(create=True, size=dna_len)
+    try:
+        shm.buf[:dna_len] = dna_bytes
+        del dna_bytes
+        tasks = [(shm.name, dna_len, sub_bytes, start, min(start + shard_size, dna_len))
+                 for start in range(0, dna_len, shard_size)]
+        with Pool(processes) as pool:
+            results = pool.map(search_shard, tasks)
+    finally:
+        shm.close()
+        shm.unlink()
+
+    # Os trechos estão em ordem, então basta concatenar as posições
+    positions = []
+    comparisons = 0
+    for shard_positions, shard_comparisons in results:
+        positions.extend(shard_positions)
+        comparisons += shard_comparisons
     return positions, comparisons
@@ -0,0 +1,122 @@
+import mmap
+import struct
+
+from fasta import read_sequence_blocks
+
+# Cada base ocupa 2 bits: 4 bases por byte
+DNA_CODES = {"A": 0, "C": 1, "G": 2, "T": 3}
+DNA_BASES = "ACGT"
+
+# Cabeçalho do arquivo codificado: assinatura + quantidade de bases
+MAGIC = b"DNA2"
+HEADER = struct.Struct("<4sQ")
+
+
+def encode_pattern(subsequence):
+    # Converte a subsequência para a lista de códigos de 2 bits,
+    # validando os caracteres uma única vez
+    try:
+        return [DNA_CODES[base] for base in subsequence]
+    except KeyError as e:
+        raise ValueError(f"Caractere inválido na sequência: {e.args[0]!r}") from None
+
+
+def pack_codes(codes, buffer, offset=0):
+    # Escreve os códigos no buffer a partir da base 'offset'
+    for k, code in enumerate(codes):
+        pos = offset + k
+        buffer[pos >> 2] |= code << ((pos & 3) * 2)
+
+
+def encode_dna(dna_sequence):
+    codes = encode_pattern(dna_sequence)
+    buffer = bytearray((len(codes) + 3) // 4)
+    pack_codes(codes, buffer)
+    return buffer, len(codes)
+
+
+def encode_dna_file(text_path, packed_path, block_size=1 << 20):
+    # Codifica um arquivo FASTA ou texto (ignorando cabeçalhos ">...",
+    # quebras de linha e espaços; bases minúsculas, mascaradas, viram
+    # maiúsculas) lendo em blocos, sem carregar a sequência inteira na
+    # memória. Registros de um FASTA são concatenados
+    length = 0
+    pending = bytearray(1)
+    with open(packed_path, "wb") as dst:
+        dst.write(HEADER.pack(MAGIC, 0))
+        for _, chunk in read_sequence_blocks(text_path, block_size):
+            if not chunk:
+                continue
+            codes = encode_pattern(chunk)
+            start = length & 3
+            buffer = pending + bytearray((start + len(codes)) // 4)
+            pack_codes(codes, buffer, start)
+            length += len(codes)
+            full = (start + len(codes)) // 4
+            dst.write(buffer[:full])
+            pending = buffer[full:full + 1] or bytearray(1)
+        if length & 3:
+            dst.write(pending)
+        dst.seek(0)
+        dst.write(HEADER.pack(MAGIC, length))
+    return length
+
+
+class PackedDNA:
+    # Sequência de DNA com 2 bits por base. Pode ser indexada como uma
+    # lista de códigos, então kmp_search, compute_lps_array e basic_search
+    # funcionam diretamente sobre ela (com o padrão vindo de encode_pattern)
+
+    def __init__(self, buffer, length, offset=0):
+        self.buffer = buffer
+        self.length = length
+        self.offset = offset
+        self._file = None
+
+    @classmethod
+    def from_string(cls, dna_sequence):
+        buffer, length = encode_dna(dna_sequence)
+        return cls(buffer, length)
+
+    @classmethod
+    def open(cls, packed_path):
+        file = open(packed_path, "rb")
+        try:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            file.close()
+            raise ValueError("Arquivo codificado vazio ou inválido.") from None
+        magic, length = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            buffer.close()
+            file.close()
+            raise ValueError("Arquivo não está no formato DNA de 2 bits.")
+        packed = cls(buffer, length, HEADER.size)
+        packed._file = file
+        return packed
+
+    def close(self):
+        if self._file is not None:
+            self.buffer.close()
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self.length
+        if not 0 <= i < self.length:
+            raise IndexError("índice fora da sequência")
+        return (self.buffer[self.offset + (i >> 2)] >> ((i & 3) * 2)) & 3
+
+    def decode(self, start=0, stop=None):
+        stop = self.length if stop is None else min(stop, self.length)
+        return "".join(DNA_BASES[self[i]] for i in range(start, stop))
@@ -0,0 +1,108 @@
+# Funções para criar o autômato KMP usado pelo busca_v2.py
+
+from array import array
+
+# Classe que representa todos os símbolos que não aparecem na cadeia
+# buscada (com eles o autômato sempre volta para s0)
+OUTRO = 'OUTRO'
+
+# O alfabeto vem da própria cadeia, mais a classe OUTRO
+def criaAlfabeto(cadeia):
+    return sorted(set(cadeia)) + [OUTRO]
+
+# Troca os símbolos que não estão no alfabeto pela classe OUTRO
+def classeSimbolo(simbolo, alfabeto):
+    return simbolo if simbolo in alfabeto else OUTRO
+
+# Cria a tabela de transições do autômato KMP usando a função de falha:
+# o estado 'x' é o estado em que o autômato estaria se tivesse lido a
+# cadeia sem a primeira letra, e as transições de erro do estado j são
+# copiadas dele. Cada estado custa |alfabeto|, então o total é O(m·|Σ|).
+# tabela[estado][indice do símbolo no alfabeto] = próximo estado
+def criaTabelaKMP(cadeia, alfabeto):
+    indice = {letra: k for k, letra in enumerate(alfabeto)}
+    tabela = [[0] * len(alfabeto) for _ in range(len(cadeia) + 1)]
+    if cadeia:
+        tabela[0][indice[cadeia[0]]] = 1
+    x = 0
+    for estado in range(1, len(cadeia) + 1):
+        tabela[estado] = list(tabela[x])
+        if estado < len(cadeia):
+            letra_correta = indice[cadeia[estado]]
+            tabela[estado][letra_correta] = estado + 1
+            x = tabela[x][letra_correta]
+    return tabela
+
+# Cria todas as transicoes para o autômato KMP no formato
+# [estado_antes, letra, estado_depois]
+def criaTransicoes(cadeia, alfabeto):
+  tabela = criaTabelaKMP(cadeia, alfabeto)
+  transicoes = []
+  for estado in range(len(tabela)):
+    for k, letra in enumerate(alfabeto):
+      transicoes.append(['s'+str(estado), letra, 's'+str(tabela[estado][k])])
+  return transicoes
+
+# Versão compilada do autômato: uma tabela densa de inteiros com uma linha
+# por estado e uma coluna para cada valor de byte (0 a 255). O executor lê
+# bytes e indexa a tabela direto, sem montar tuplas nem consultar dicionários.
+# backend='list': lista de listas (mais rápido em Python puro)
+# backend='array': um único array('i') contíguo (mais compacto); os estados
+# já vêm multiplicados por 256, então o índice é só estado + byte
+def empacotaTabela(tabela, backend='list'):
+    if backend == 'list':
+        return tabela
+    if backend == 'array':
+        return array('i', (proximo * 256 for linha in tabela for proximo in linha))
+    raise ValueError("backend deve ser 'list' ou 'array'")
+
+def compilaTabela(cadeia, backend='list'):
+    padrao = cadeia.encode('utf-8') if isinstance(cadeia, str) else bytes(cadeia)
+    return empacotaTabela(criaTabelaKMP(padrao, list(range(256))), backend)
+
+# Compila um autômato dado como lista de transições [estado, letra, estado]
+# (como o autômato fixo do busca_v1). Símbolos sem transição vão para o
+# primeiro estado da lista, a não ser que exista uma transição OUTRO
+def compilaTransicoes(transicoes, estados, backend='list'):
+    indice = {estado: k for k, estado in enumerate(estados)}
+    tabela = [[0] * 256 for _ in estados]
+    for origem, letra, destino in transicoes:
+        if letra == OUTRO:
+            tabela[indice[origem]] = [indice[destino]] * 256
+    for origem, letra, destino in transicoes:
+        if letra != OUTRO:
+            for byte in letra.encode('utf-8'):
+                tabela[indice[origem]][byte] = indice[destino]
+    return empacotaTabela(tabela, backend)
+
+# Executa a tabela sobre os bytes 'dados' a partir de 'estado'. Retorna o
+# índice (somado a 'deslocamento') do último byte de cada ocorrência, isto
+# é, de cada vez que o autômato entra em um estado final, e o estado ao
+# fim do bloco, para continuar no próximo bloco
+def executaBloco(tabela, dados, finais, estado=0, deslocamento=0):
+    fins = []
+    achou = fins.append
+    if not isinstance(tabela, list):
+        # Tabela plana com estados multiplicados por 256 (array('i') ou
+        # memoryview de um arquivo do cache)
+        finais = {final * 256 for final in finais}
+        estado = estado * 256
+        for i, byte in enumerate(dados, deslocamento):
+            estado = tabela[estado + byte]
+            if estado in finais:
+                achou(i)
+        return fins, estado // 256
+    for i, byte in enumerate(dados, deslocamento):
+        estado = tabela[estado][byte]
+        if estado in finais:
+            achou(i)
+    return fins, estado
+
+# Executa a tabela do autômato KMP sobre os bytes 'dados'. Retorna as
+# posições de início das ocorrências e a quantidade de comparações (uma
+# por símbolo lido)
+def executaTabela(tabela, dados, tamanho_cadeia):
+    if tamanho_cadeia == 0:
+        return [], len(dados)
+    fins, _ = executaBloco(tabela, dados, {tamanho_cadeia})
+    return [fim - tamanho_cadeia + 1 for fim in fins], len(dados)
@@ -0,0 +1,117 @@
+# Busca uma cadeia em vários arquivos de uma vez (diretórios ou globs)
+# Exemplo de uso:
+# $ python busca_lote.py -c aba . "logs/**/*.txt" -p 8 > resultados.jsonl
+#
+# O autômato é compilado uma única vez (usando o cache) e os arquivos são
+# distribuídos entre os processos. Cada arquivo gera uma linha JSON na
+# saída assim que termina; o resumo com a vazão total sai no stderr.
+
+import fnmatch
+import glob
+import json
+import os
+import sys
+import time
+from argparse import ArgumentParser
+from array import array
+from multiprocessing import Pool
+
+from automato import compilaTabela
+from cache import tabelaKMPComCache
+from fluxo import leBlocos, buscaAutomatoFluxo
+
+# Tabela, estados finais e tamanho da cadeia de cada processo
+tabela_processo = None
+finais_processo = None
+tamanho_processo = None
+bloco_processo = None
+
+
+def iniciaProcesso(tabela, tamanho, bloco):
+    global tabela_processo, finais_processo, tamanho_processo, bloco_processo
+    tabela_processo = tabela
+    finais_processo = {tamanho}
+    tamanho_processo = tamanho
+    bloco_processo = bloco
+
+
+def buscaArquivo(caminho):
+    inicio = time.perf_counter()
+    try:
+        fins, comparacoes, _ = buscaAutomatoFluxo(tabela_processo, leBlocos(caminho, bloco_processo),
+                                                  finais_processo)
+    except OSError as erro:
+        return {"arquivo": caminho, "erro": str(erro)}
+    return {
+        "arquivo": caminho,
+        "ocorrencias": len(fins),
+        "comparacoes": comparacoes,
+        "segundos": round(time.perf_counter() - inicio, 6),
+        "bytes": os.path.getsize(caminho),
+    }
+
+
+# Expande diretórios (recursivamente, filtrando pelo padrão de nome) e
+# globs em uma lista de arquivos, sem repetições
+def listaArquivos(entradas, padrao_nome="*"):
+    vistos = set()
+    for entrada in entradas:
+        if os.path.isdir(entrada):
+            candidatos = (os.path.join(pasta, nome)
+                          for pasta, _, nomes in os.walk(entrada)
+                          for nome in sorted(nomes) if fnmatch.fnmatch(nome, padrao_nome))
+        else:
+            candidatos = sorted(glob.glob(entrada, recursive=True))
+        for caminho in candidatos:
+            if os.path.isfile(caminho) and caminho not in vistos:
+                vistos.add(caminho)
+                yield caminho
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("entradas", nargs="+",
+                        help="Diretórios ou globs com os arquivos onde buscar")
+    parser.add_argument("-c", "--cadeia", required=True,
+                        help="Cadeia de caracteres a ser buscada")
+    parser.add_argument("-n", "--nome", default="*",
+                        help="Padrão do nome dos arquivos dentro dos diretórios (ex.: *.txt)")
+    parser.add_argument("-p", "--processos", type=int, default=os.cpu_count(),
+                        help="Quantidade de processos")
+    parser.add_argument("-b", "--bloco", type=int, default=1 << 20,
+                        help="Tamanho (em bytes) dos blocos lidos de cada arquivo")
+    parser.add_argument("--backend", default="list", choices=["list", "array"],
+                        help="Formato da tabela do autômato compilado")
+    parser.add_argument("--cache", default=None,
+                        help="Diretório do cache de autômatos compilados")
+    parser.add_argument("--sem-cache", action="store_true",
+                        help="Compila o autômato sem usar o cache")
+    args = parser.parse_args()
+
+    cadeia = args.cadeia
+    tamanho = len(cadeia.encode('utf-8'))
+    if args.sem_cache:
+        tabela = compilaTabela(cadeia, args.backend)
+    else:
+        tabela = tabelaKMPComCache(cadeia, args.backend, args.cache)[0]
+        # A tabela vai para os processos por pickle, então o mapeamento do
+        # cache (memoryview) é copiado para um array comum
+        if isinstance(tabela, memoryview):
+            tabela = array('i', tabela.tobytes())
+    inicio = time.perf_counter()
+    total_arquivos = total_bytes = total_ocorrencias = erros = 0
+    with Pool(args.processos, initializer=iniciaProcesso, initargs=(tabela, tamanho, args.bloco)) as pool:
+        for resultado in pool.imap_unordered(buscaArquivo, listaArquivos(args.entradas, args.nome)):
+            print(json.dumps(resultado, ensure_ascii=False), flush=True)
+            if "erro" in resultado:
+                erros += 1
+                continue
+            total_arquivos += 1
+            total_bytes += resultado["bytes"]
+            total_ocorrencias += resultado["ocorrencias"]
+    segundos = time.perf_counter() - inicio
+
+    vazao = total_bytes / (1 << 20) / segundos if segundos > 0 else 0
+    print(f"Arquivos: {total_arquivos} (erros: {erros})", file=sys.stderr)
+    print(f"Ocorrências: {total_ocorrencias}", file=sys.stderr)
+    print(f"Bytes lidos: {total_bytes} em {segundos:.3f} s ({vazao:.2f} MB/s)", file=sys.stderr)
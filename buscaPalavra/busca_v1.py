@@ -10,6 +10,10 @@ parser.add_argument("-f", "--file", default="entrada.txt",
                     help="Nome do arquivo onde buscar", metavar="FILE")
 parser.add_argument("-c", "--cadeia",
                     help="Cadeia de caracteres a ser buscada")
+parser.add_argument("-b", "--bloco", type=int, default=1 << 20,
+                    help="Tamanho (em bytes) dos blocos lidos do arquivo")
+parser.add_argument("-v", "--verbose", action="store_true",
+                    help="Mostra as posições encontradas, o autômato e cada passo dele")
 
 args = parser.parse_args()
 
@@ -18,41 +22,24 @@ print("Iniciando a busca SEM autômato")
 print("Arquivo onde buscar:",args.file)
 print("O quê deve ser buscado:",args.cadeia)
 
-# Vou chamar de cadeia maior (cmaior) a cadeia
-# que está dentro do arquivo 
-cmaior=[]
-
-# Abre o arquivo de entrada e lê uma letra por vez,
-# linha por linha e vai colocando em um vetor
-file = open(args.file, "r")
-for linha in file:
-    for letra in linha:
-        if letra!='\n': cmaior.append(letra) 
-print('Cadeia maior como vetor:')              
-print(cmaior)
-
-# Transforma a cadeia menor a ser buscada também
-# em um vetor
-cmenor = [char for char in args.cadeia]
-print('Cadeia menor como vetor:')              
-print(cmenor)
+# A cadeia maior (cmaior) é a que está dentro do arquivo. Ela não é
+# montada na memória: o arquivo é lido em blocos de bytes (sem as
+# quebras de linha) e as buscas continuam de um bloco para o outro
+from fluxo import leBlocos, buscaIngenuaFluxo, buscaAutomatoFluxo
+
+cmenor = args.cadeia
+if args.verbose:
+   print('Cadeia menor como vetor:')              
+   print(list(cmenor))
 
         
 # Busca a cadeia menor dentro da cadeia maior
 # usando um método não otimizado        
-qtd_ocorrencias_sem=0
-qtd_comparacoes_sem=0
-for i in range(len(cmaior)):
-  achou=True
-  for j in range(len(cmenor)):
-     if (i+j) == len(cmaior): 
-         achou=False
-         break
-     qtd_comparacoes_sem = qtd_comparacoes_sem + 1 
-     if cmenor[j] != cmaior[i+j]: achou=False
-  if achou: 
-     print('achou na posição',i)
-     qtd_ocorrencias_sem=qtd_ocorrencias_sem+1
+posicoes_sem,qtd_comparacoes_sem=buscaIngenuaFluxo(leBlocos(args.file, args.bloco), cmenor)
+qtd_ocorrencias_sem=len(posicoes_sem)
+if args.verbose:
+   for posicao in posicoes_sem:
+      print('achou na posição',posicao)
          
       
 print("Iniciando a busca COM autômato")
@@ -79,36 +66,41 @@ transicoes=[
 dtransicoes=dict(((e1,e2),s) for e1,e2,s in transicoes)
 
 # Mostra na tela as partes do autômato
-print('Alfabeto: ',alfabeto)
-print('Estados: ',estados)
-print('Estado inicial: ',inicial)
-print('Estados finais: ',finais)
-print('Transições: ',transicoes)
-print('Transições como dicionário: ',dtransicoes)
-
-# Percorre a cadeia de  entrada e
-# executa o autômato
-qtd_ocorrencias_com=0
-qtd_comparacoes_com=0
-estado=inicial[0]
-for i in range(len(cmaior)):
-   if estado in finais:
-      print('Achou uma ocorrência na posicao ',i-len(cmenor))
-      qtd_ocorrencias_com=qtd_ocorrencias_com+1      
-   simbolo=cmaior[i]
-   print('Estado atual = ',estado)
-   print('Simbolo atual = ',simbolo)
-   estado=dtransicoes[(estado,simbolo)]
-   qtd_comparacoes_com=qtd_comparacoes_com+1
+if args.verbose:
+   print('Alfabeto: ',alfabeto)
+   print('Estados: ',estados)
+   print('Estado inicial: ',inicial)
+   print('Estados finais: ',finais)
+   print('Transições: ',transicoes)
+   print('Transições como dicionário: ',dtransicoes)
+
+   # Mostra cada passo do autômato (símbolos fora do alfabeto
+   # voltam para o estado inicial)
+   estado=inicial[0]
+   for bloco in leBlocos(args.file, args.bloco):
+      for simbolo in bloco.decode('utf-8', errors='replace'):
+         print('Estado atual = ',estado)
+         print('Simbolo atual = ',simbolo)
+         estado=dtransicoes.get((estado,simbolo), inicial[0])
+
+# Percorre a cadeia de entrada e executa o autômato compilado
+# em uma tabela de inteiros, bloco a bloco
+from automato import compilaTransicoes
+
+tabela=compilaTransicoes(transicoes, estados)
+indices_finais={estados.index(final) for final in finais}
+fins,qtd_comparacoes_com,estado=buscaAutomatoFluxo(tabela, leBlocos(args.file, args.bloco), indices_finais)
+qtd_ocorrencias_com=len(fins)
+if args.verbose:
+   for fim in fins:
+      print('Achou uma ocorrência na posicao ',fim-len(cmenor)+1)
    
 # Decide se a cadeia foi aceita ou não
 # IMPORTANTE: Este autômato do exemplo
 # faz um pouco mais do que apenas dizer
 # se a cadeia é aceita ou não. Ele busca
 # coisas dentro da cadeia   
-if estado in finais:
-   print('Achou uma ocorrência na posicao ',len(cmaior)-len(cmenor))
-   qtd_ocorrencias_com=qtd_ocorrencias_com+1      
+if estado in indices_finais:
    print('Cadeia aceita')
 else:
    print('Cadeia rejeitada') 
@@ -13,6 +13,20 @@ parser.add_argument("-f", "--file", default="entrada.txt",
                     help="Nome do arquivo onde buscar", metavar="FILE")
 parser.add_argument("-c", "--cadeia",
                     help="Cadeia de caracteres a ser buscada")
+parser.add_argument("--backend", default="list", choices=["list", "array"],
+                    help="Formato da tabela do autômato compilado")
+parser.add_argument("-b", "--bloco", type=int, default=1 << 20,
+                    help="Tamanho (em bytes) dos blocos lidos do arquivo")
+parser.add_argument("-p", "--processos", type=int, default=1,
+                    help="Processos para executar o autômato em paralelo (trechos especulativos)")
+parser.add_argument("--cache", default=None,
+                    help="Diretório do cache de autômatos compilados (padrão: ~/.cache/buscaPalavra)")
+parser.add_argument("--sem-cache", action="store_true",
+                    help="Compila o autômato sem usar o cache")
+parser.add_argument("-g", "--grafo", default="podado", choices=["podado", "completo", "nenhum"],
+                    help="Como desenhar o autômato em G.html (nenhum: não desenha)")
+parser.add_argument("-v", "--verbose", action="store_true",
+                    help="Mostra as posições encontradas e as partes do autômato")
 
 args = parser.parse_args()
 
@@ -21,125 +35,91 @@ print("Iniciando a busca SEM autômato")
 print("Arquivo onde buscar:",args.file)
 print("O quê deve ser buscado:",args.cadeia)
 
-# Vou chamar de cadeia maior (cmaior) a cadeia
-# que está dentro do arquivo 
-cmaior=[]
-
-# Abre o arquivo de entrada e lê uma letra por vez,
-# linha por linha e vai colocando em um vetor
-file = open(args.file, "r")
-for linha in file:
-    for letra in linha:
-        if letra!='\n': cmaior.append(letra) 
-print('Cadeia maior como vetor:')              
-print(cmaior)
-
-# Transforma a cadeia menor a ser buscada também
-# em um vetor
-cmenor = [char for char in args.cadeia]
-print('Cadeia menor como vetor:')              
-print(cmenor)
+# A cadeia maior (cmaior) é a que está dentro do arquivo. Ela não é
+# montada na memória: o arquivo é lido em blocos de bytes (sem as
+# quebras de linha) e as buscas continuam de um bloco para o outro
+from fluxo import leBlocos, buscaIngenuaFluxo, buscaAutomatoFluxo
+
+cmenor = args.cadeia
+if args.verbose:
+   print('Cadeia menor como vetor:')              
+   print(list(cmenor))
 
         
 # Busca a cadeia menor dentro da cadeia maior
 # usando um método não otimizado        
-qtd_ocorrencias_sem=0
-qtd_comparacoes_sem=0
-for i in range(len(cmaior)):
-  achou=True
-  for j in range(len(cmenor)):
-     if (i+j) == len(cmaior): 
-         achou=False
-         break
-     qtd_comparacoes_sem = qtd_comparacoes_sem + 1 
-     if cmenor[j] != cmaior[i+j]: achou=False
-  if achou: 
-     print('achou na posição',i)
-     qtd_ocorrencias_sem=qtd_ocorrencias_sem+1
+posicoes_sem,qtd_comparacoes_sem=buscaIngenuaFluxo(leBlocos(args.file, args.bloco), cmenor)
+qtd_ocorrencias_sem=len(posicoes_sem)
+if args.verbose:
+   for posicao in posicoes_sem:
+      print('achou na posição',posicao)
          
       
 print("Iniciando a busca COM autômato")
 
 
-# Cálcula o tamanho do maior prefixo que é igual
-# a um sufixo da cadeia
-def maiorPrefSufProprio(cadeia):
-    maior=0
-    # Usando o reserved pois quando achar o primeiro pode parar
-    for i in reversed(range(len(cadeia)-1)):
-        prefixo=cadeia[:(i+1)]
-        sufixo=cadeia[-(i+1):]
-        if prefixo==sufixo: 
-           if len(prefixo) > maior:
-              maior=len(prefixo)
-              break
-    return maior
-
-# Cria todas as transicoes para o autômato KMP
-def criaTransicoes(cadeia):
-  sub=""
-  estado=0
-  transicoes=[]
-  for estado in range(len(cadeia)+1):
-    if estado < len(cadeia): letra_correta=cadeia[estado]
-    else: letra_correta = 'FIM'
-    for letra_alternativa in alfabeto:
-      if letra_alternativa == letra_correta:
-         proximo = estado+1
-      else:
-         proximo = maiorPrefSufProprio(sub+letra_alternativa)
-      estado_antes = 's'+str(estado)
-      estado_depois = 's'+str(proximo)
-      transicao=[estado_antes,letra_alternativa,estado_depois]
-      transicoes.append(transicao)
-    estado=estado+1
-    sub=sub+letra_correta
-  return(transicoes)
-  
-# Criando o autômato KMP para buscar a palavra passada como parâmetro
+# Criando o autômato KMP para buscar a palavra passada como parâmetro.
+# As transições são criadas a partir da função de falha, em O(m·|Σ|),
+# e o alfabeto vem da própria cadeia (mais a classe OUTRO para os
+# símbolos que não aparecem nela)
+from automato import criaAlfabeto, criaTransicoes, compilaTabela
+from cache import tabelaKMPComCache
+
 cadeia=args.cadeia
+tamanho=len(cadeia.encode('utf-8'))  # a tabela trabalha com bytes
+# O autômato mostrado e desenhado é o de caracteres (um estado por
+# caractere da cadeia, como criaTransicoes); a busca usa a tabela de
+# bytes, com tamanho+1 estados
 total_estados=range(len(cadeia)+1)
-alfabeto=['a','b']
+alfabeto=criaAlfabeto(cadeia)
 estados=['s'+str(n) for n in total_estados]
 inicial=estados[:1] 
 finais=estados[-1:]
-transicoes=criaTransicoes(cadeia)
-
-
-# Aqui estou criando uma versão das transicoes
-# usando um dicionário para deixar a busca
-# pelo próximo estado mais eficiente
-dtransicoes=dict(((e1,e2),s) for e1,e2,s in transicoes)
-
-# Mostra na tela as partes do autômato
-print('Alfabeto: ',alfabeto)
-print('Estados: ',estados)
-print('Estado inicial: ',inicial)
-print('Estados finais: ',finais)
-print('Transições: ',transicoes)
-print('Transições como dicionário: ',dtransicoes)
-
-# Percorre a cadeia de  entrada e
-# executa o autômato
-qtd_ocorrencias_com=0
-qtd_comparacoes_com=0
-estado=inicial[0]
-for i in range(len(cmaior)):
-   if estado in finais:
-      print('Achou uma ocorrência na posicao ',i-len(cmenor))
-      qtd_ocorrencias_com=qtd_ocorrencias_com+1      
-   simbolo=cmaior[i]
-   estado=dtransicoes[(estado,simbolo)]
-   qtd_comparacoes_com=qtd_comparacoes_com+1
+
+# Mostra na tela as partes do autômato. As transições como lista e
+# como dicionário só são montadas aqui, para mostrar; a busca usa a
+# tabela compilada
+if args.verbose:
+   transicoes=criaTransicoes(cadeia, alfabeto)
+   dtransicoes=dict(((e1,e2),s) for e1,e2,s in transicoes)
+   print('Alfabeto: ',alfabeto)
+   print('Estados: ',estados)
+   print('Estado inicial: ',inicial)
+   print('Estados finais: ',finais)
+   print('Transições: ',transicoes)
+   print('Transições como dicionário: ',dtransicoes)
+
+# A tabela compilada fica em um cache em disco, indexado pelo hash da
+# cadeia, para não ser recriada a cada execução (com --backend array o
+# arquivo do cache é só mapeado em memória)
+def obtemTabela(backend):
+   if args.sem_cache:
+      return compilaTabela(cadeia, backend)
+   return tabelaKMPComCache(cadeia, backend, args.cache)[0]
+
+# Percorre a cadeia de entrada e executa o autômato compilado:
+# uma tabela de inteiros (estados x valores de byte) indexada
+# diretamente pelos bytes do arquivo, bloco a bloco
+# Com -p maior que 1, o arquivo é cortado em trechos simulados em
+# paralelo a partir de todos os estados e depois costurados em ordem
+if args.processos > 1:
+   from paralelo import buscaAutomatoParalela
+   tabela=obtemTabela('list')
+   fins,qtd_comparacoes_com,estado=buscaAutomatoParalela(tabela, args.file, {tamanho}, processos=args.processos)
+else:
+   tabela=obtemTabela(args.backend)
+   fins,qtd_comparacoes_com,estado=buscaAutomatoFluxo(tabela, leBlocos(args.file, args.bloco), {tamanho})
+qtd_ocorrencias_com=len(fins)
+if args.verbose:
+   for fim in fins:
+      print('Achou uma ocorrência na posicao ',fim-tamanho+1)
    
 # Decide se a cadeia foi aceita ou não
 # IMPORTANTE: Este autômato do exemplo
 # faz um pouco mais do que apenas dizer
 # se a cadeia é aceita ou não. Ele busca
 # coisas dentro da cadeia   
-if estado in finais:
-   print('Achou uma ocorrência na posicao ',len(cmaior)-len(cmenor))
-   qtd_ocorrencias_com=qtd_ocorrencias_com+1      
+if estado == tamanho:
    print('Cadeia aceita')
 else:
    print('Cadeia rejeitada') 
@@ -150,28 +130,14 @@ print('Quantidade de ocorrências COM autômato = ',qtd_ocorrencias_com)
 print('Quantidade de comparações COM autômato = ',qtd_comparacoes_com)
    
    
-# Importa uma biblioteca que implementa um monte de funcionalidades
-# para trabalhar com grafos (aqui neste exemplo vamos usar apenas
-# para mostrar o autômato)
-import networkx as nx 
-#import matplotlib.pyplot as plt
-from pyvis.network import Network
-
-# Cria um grafo vazio
-G = nx.DiGraph()
-
-# Coloca os vértices no grafo G
-G.add_nodes_from(estados)
-
-# Colocar as arestas no grafo G
-for v in transicoes:
-   G.add_edge(v[0],v[2],label=v[1])
-   
-# Visualizando o grafo usando networkx e pyvis
-nt = Network('500px', '800px', directed=True)
-nt.from_nx(G)
-nt.show('G.html', True)
-
-
-
-  
+# Desenha o autômato no navegador (networkx + pyvis, importados só
+# quando o grafo é pedido). No modo podado só aparecem as arestas para
+# frente e as de volta que não vão para s0; as que voltam para s0 viram
+# uma aresta "outros". O G.html só é gerado de novo se o autômato mudar
+if args.grafo != 'nenhum':
+   from cache import chaveAutomato
+   from grafo import desenhaGrafo
+
+   transicoes=criaTransicoes(cadeia, alfabeto)
+   if not desenhaGrafo(estados, transicoes, chaveAutomato(cadeia, alfabeto), 'G.html', args.grafo):
+      print('G.html já está atualizado para este autômato')
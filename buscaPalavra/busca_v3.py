@@ -0,0 +1,100 @@
+# Busca um padrão com curingas e classes de caracteres dentro de um arquivo
+# Exemplo de uso:
+# $ python busca_v3.py -c "ab?a" -f exemplo_maior.txt
+# $ python busca_v3.py -c "[ab]ba*" -f exemplo_maior.txt -v
+#
+# ? = qualquer letra, * = o item anterior repetido (ba* = b, ba, baa...;
+# ?* = qualquer sequência), [ab] = a ou b, [^ab] = nem a nem b
+# O padrão é compilado em um único autômato (AFN -> AFD -> AFD mínimo), então
+# a busca continua sendo uma passada só, sem testar cada expansão do padrão.
+
+from argparse import ArgumentParser
+
+parser = ArgumentParser()
+parser.add_argument("-f", "--file", default="entrada.txt",
+                    help="Nome do arquivo onde buscar", metavar="FILE")
+parser.add_argument("-c", "--cadeia",
+                    help="Padrão a ser buscado (aceita ?, *, [classes])")
+parser.add_argument("--backend", default="list", choices=["list", "array"],
+                    help="Formato da tabela do autômato compilado")
+parser.add_argument("-b", "--bloco", type=int, default=1 << 20,
+                    help="Tamanho (em bytes) dos blocos lidos do arquivo")
+parser.add_argument("-p", "--processos", type=int, default=1,
+                    help="Processos para executar o autômato em paralelo (trechos especulativos)")
+parser.add_argument("--cache", default=None,
+                    help="Diretório do cache de autômatos compilados (padrão: ~/.cache/buscaPalavra)")
+parser.add_argument("--sem-cache", action="store_true",
+                    help="Compila o autômato sem usar o cache")
+parser.add_argument("-g", "--grafo", default="nenhum", choices=["podado", "completo", "nenhum"],
+                    help="Como desenhar o autômato em G.html (nenhum: não desenha)")
+parser.add_argument("-v", "--verbose", action="store_true",
+                    help="Mostra as posições encontradas e as partes do autômato")
+
+args = parser.parse_args()
+
+# Mostra os parâmetros lidos
+print("Iniciando a busca COM autômato")
+print("Arquivo onde buscar:",args.file)
+print("O quê deve ser buscado:",args.cadeia)
+
+# Compila o padrão (ou carrega do cache) para a mesma tabela de
+# inteiros (estados x valores de byte) usada pelo busca_v2
+from padroes import compilaPadrao, alfabetoPadrao, transicoesPadrao, VERSAO_SINTAXE
+from cache import tabelaPadraoComCache, chaveAutomato
+from automato import empacotaTabela
+from fluxo import leBlocos, buscaAutomatoFluxo
+
+padrao=args.cadeia
+backend='list' if args.processos > 1 else args.backend
+if args.sem_cache:
+   tabela,indices_finais=compilaPadrao(padrao)
+   tabela=empacotaTabela(tabela, backend)
+else:
+   tabela,indices_finais=tabelaPadraoComCache(padrao, backend, args.cache)
+
+total_estados=len(tabela) if isinstance(tabela, list) else len(tabela)//256
+estados=['s'+str(n) for n in range(total_estados)]
+inicial=estados[:1]
+finais=['s'+str(n) for n in sorted(indices_finais)]
+alfabeto=alfabetoPadrao(padrao)
+
+# Mostra na tela as partes do autômato
+if args.verbose:
+   linhas,_=compilaPadrao(padrao)
+   transicoes=transicoesPadrao(linhas, alfabeto)
+   print('Alfabeto: ',alfabeto)
+   print('Estados: ',estados)
+   print('Estado inicial: ',inicial)
+   print('Estados finais: ',finais)
+   print('Transições: ',transicoes)
+
+# Percorre o arquivo executando o autômato. Como '*' deixa as
+# ocorrências com tamanhos diferentes, a posição informada é a
+# da última letra de cada ocorrência
+if args.processos > 1:
+   from paralelo import buscaAutomatoParalela
+   fins,qtd_comparacoes,estado=buscaAutomatoParalela(tabela, args.file, indices_finais, processos=args.processos)
+else:
+   fins,qtd_comparacoes,estado=buscaAutomatoFluxo(tabela, leBlocos(args.file, args.bloco), indices_finais)
+if args.verbose:
+   for fim in fins:
+      print('Achou uma ocorrência terminando na posicao ',fim)
+
+if estado in indices_finais:
+   print('Cadeia aceita')
+else:
+   print('Cadeia rejeitada')
+
+print('Quantidade de estados do autômato mínimo = ',total_estados)
+print('Quantidade de ocorrências COM autômato = ',len(fins))
+print('Quantidade de comparações COM autômato = ',qtd_comparacoes)
+
+# Desenha o autômato no navegador (networkx + pyvis, importados só
+# quando o grafo é pedido)
+if args.grafo != 'nenhum':
+   from grafo import desenhaGrafo
+
+   linhas,_=compilaPadrao(padrao)
+   transicoes=transicoesPadrao(linhas, alfabeto)
+   if not desenhaGrafo(estados, transicoes, chaveAutomato(padrao, ('curingas', VERSAO_SINTAXE)), 'G.html', args.grafo):
+      print('G.html já está atualizado para este autômato')
@@ -0,0 +1,156 @@
+# Cache em disco dos autômatos compilados. Cada autômato é salvo como uma
+# tabela binária compacta (int32, estados x 256 bytes, no formato do backend
+# 'array') em um arquivo cujo nome é o hash da cadeia e do alfabeto. Com o
+# backend 'array' o arquivo é só mapeado em memória (mmap), sem cópia nem
+# conversão. Quando o diretório passa do limite de tamanho, os arquivos
+# usados há mais tempo são apagados.
+
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from automato import empacotaTabela
+
+# Mude a versão quando o formato da tabela ou a forma de compilar mudarem
+VERSAO = 1
+MAGIC = b"AUT1"
+CABECALHO = struct.Struct("<4sII")
+LIMITE_PADRAO = 64 << 20
+
+def diretorioPadrao():
+    return os.environ.get("BUSCA_CACHE",
+                          os.path.join(os.path.expanduser("~"), ".cache", "buscaPalavra"))
+
+def chaveAutomato(cadeia, alfabeto):
+    texto = repr((VERSAO, cadeia, alfabeto)).encode('utf-8')
+    return hashlib.sha256(texto).hexdigest()
+
+def caminhoAutomato(chave, diretorio=None):
+    return os.path.join(diretorio or diretorioPadrao(), chave + ".aut")
+
+# Formato: cabeçalho (assinatura, estados, finais) | finais | tabela com os
+# estados já multiplicados por 256
+def salvaAutomato(chave, tabela, finais, diretorio=None):
+    diretorio = diretorio or diretorioPadrao()
+    os.makedirs(diretorio, exist_ok=True)
+    caminho = caminhoAutomato(chave, diretorio)
+    temporario = caminho + ".%d.tmp" % os.getpid()
+    plana = array('i', (proximo for linha in tabela for proximo in linha))
+    with open(temporario, "wb") as arquivo:
+        arquivo.write(CABECALHO.pack(MAGIC, len(tabela), len(finais)))
+        arquivo.write(array('i', sorted(finais)).tobytes())
+        arquivo.write(multiplica256(plana).tobytes())
+    # os.replace é atômico: outro processo nunca vê um arquivo pela metade
+    os.replace(temporario, caminho)
+    return caminho
+
+# Retorna (tabela, finais) ou None se o autômato não estiver no cache
+def carregaAutomato(chave, backend='list', diretorio=None):
+    caminho = caminhoAutomato(chave, diretorio)
+    try:
+        with open(caminho, "rb") as arquivo:
+            mapa = mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+    except (FileNotFoundError, ValueError):
+        return None
+    # Arquivo truncado (ou que não é um autômato): tratado como ausente
+    if len(mapa) < CABECALHO.size:
+        mapa.close()
+        return None
+    magic, total_estados, total_finais = CABECALHO.unpack_from(mapa, 0)
+    inicio = CABECALHO.size + 4 * total_finais
+    if magic != MAGIC or len(mapa) != inicio + 4 * 256 * total_estados:
+        mapa.close()
+        return None
+    finais = set(array('i', mapa[CABECALHO.size:inicio]))
+    # Atualiza a data de uso, usada na remoção dos mais antigos. O arquivo
+    # pode ter sido apagado por outro processo, mas o mapeamento continua
+    # válido
+    try:
+        os.utime(caminho)
+    except OSError:
+        pass
+    if backend == 'array':
+        # A memoryview mantém o mapeamento aberto enquanto a tabela existir
+        return memoryview(mapa)[inicio:].cast('i'), finais
+    plana = divide256(array('i', mapa[inicio:]))
+    mapa.close()
+    tabela = [plana[k:k + 256].tolist() for k in range(0, len(plana), 256)]
+    return empacotaTabela(tabela, backend), finais
+
+# Multiplica (ou divide) todos os estados por 256. Em little-endian isso é
+# só deslocar cada inteiro de 4 bytes em um byte, o que é feito com
+# atribuições de fatias, sem laço em Python
+def multiplica256(plana):
+    if sys.byteorder != 'little' or plana.itemsize != 4 or (plana and max(plana) >= 1 << 23):
+        return array('i', (proximo * 256 for proximo in plana))
+    origem = plana.tobytes()
+    destino = bytearray(len(origem))
+    destino[1::4] = origem[0::4]
+    destino[2::4] = origem[1::4]
+    destino[3::4] = origem[2::4]
+    return array('i', destino)
+
+def divide256(plana):
+    if sys.byteorder != 'little' or plana.itemsize != 4:
+        return array('i', (proximo // 256 for proximo in plana))
+    origem = plana.tobytes()
+    destino = bytearray(len(origem))
+    destino[0::4] = origem[1::4]
+    destino[1::4] = origem[2::4]
+    destino[2::4] = origem[3::4]
+    return array('i', destino)
+
+# Apaga os autômatos usados há mais tempo até o cache caber no limite
+def limitaCache(limite=LIMITE_PADRAO, diretorio=None):
+    diretorio = diretorio or diretorioPadrao()
+    try:
+        nomes = [nome for nome in os.listdir(diretorio) if nome.endswith(".aut")]
+    except FileNotFoundError:
+        return
+    arquivos = []
+    for nome in nomes:
+        caminho = os.path.join(diretorio, nome)
+        try:
+            info = os.stat(caminho)
+        except FileNotFoundError:
+            continue
+        arquivos.append((info.st_mtime, info.st_size, caminho))
+    total = sum(tamanho for _, tamanho, _ in arquivos)
+    for _, tamanho, caminho in sorted(arquivos):
+        if total <= limite:
+            break
+        try:
+            os.remove(caminho)
+        except OSError:
+            pass  # Já removido por outro processo, ou ainda em uso
+        total -= tamanho
+
+# Procura o autômato no cache; se não estiver, chama compila() (que retorna
+# (tabela como lista de listas, finais)), salva e aplica o limite de tamanho
+def compilaComCache(chave, compila, backend='list', diretorio=None, limite=LIMITE_PADRAO):
+    encontrado = carregaAutomato(chave, backend, diretorio)
+    if encontrado is not None:
+        return encontrado
+    tabela, finais = compila()
+    try:
+        salvaAutomato(chave, tabela, finais, diretorio)
+        limitaCache(limite, diretorio)
+    except OSError:
+        pass  # Sem permissão ou sem espaço: segue sem cache
+    return empacotaTabela(tabela, backend), set(finais)
+
+# Tabela do autômato KMP para a cadeia, usando o cache
+def tabelaKMPComCache(cadeia, backend='list', diretorio=None, limite=LIMITE_PADRAO):
+    from automato import compilaTabela
+    chave = chaveAutomato(cadeia, 'bytes')
+    return compilaComCache(chave, lambda: (compilaTabela(cadeia), {len(cadeia.encode('utf-8'))}),
+                           backend, diretorio, limite)
+
+# Tabela do autômato de um padrão com curingas (padroes.py), usando o cache
+def tabelaPadraoComCache(padrao, backend='list', diretorio=None, limite=LIMITE_PADRAO):
+    from padroes import compilaPadrao, VERSAO_SINTAXE
+    chave = chaveAutomato(padrao, ('curingas', VERSAO_SINTAXE))
+    return compilaComCache(chave, lambda: compilaPadrao(padrao), backend, diretorio, limite)
@@ -0,0 +1,61 @@
+# Leitura em fluxo para o busca_v1.py e o busca_v2.py: o arquivo é lido em
+# blocos de bytes, sem montar a lista cmaior com todos os caracteres, e as
+# duas buscas (sem e com autômato) continuam de um bloco para o outro.
+
+from automato import executaBloco
+
+# Lê o arquivo em blocos de bytes, já sem as quebras de linha (as posições
+# são contadas na cadeia sem '\n', como no cmaior)
+def leBlocos(caminho, tamanho_bloco=1 << 20):
+    with open(caminho, "rb") as arquivo:
+        while True:
+            bloco = arquivo.read(tamanho_bloco)
+            if not bloco:
+                break
+            yield bloco.replace(b'\n', b'')
+
+# Busca sem autômato em fluxo: o mesmo laço letra a letra da busca
+# original, que compara, para cada posição i, min(m, n-i) letras (ela não
+# para no primeiro erro), contando as comparações enquanto busca. As
+# últimas m-1 letras de cada bloco são guardadas para achar ocorrências
+# que atravessam a fronteira entre blocos.
+# Retorna (posições, quantidade de comparações)
+def buscaIngenuaFluxo(blocos, cadeia):
+    padrao = cadeia.encode('utf-8')
+    m = len(padrao)
+    posicoes = []
+    comparacoes = 0
+    if m == 0:
+        return posicoes, comparacoes
+    sobra = b''
+    inicio_sobra = 0  # posição de sobra[0] na cadeia maior
+    for bloco in blocos:
+        janela = sobra + bloco
+        # Só as posições com as m letras dentro da janela são testadas agora
+        corte = max(len(janela) - (m - 1), 0)
+        for i in range(corte):
+            achou = True
+            for j in range(m):
+                comparacoes += 1
+                if padrao[j] != janela[i + j]:
+                    achou = False
+            if achou:
+                posicoes.append(inicio_sobra + i)
+        sobra = janela[corte:]
+        inicio_sobra += corte
+    # No fim da cadeia maior, as posições que sobraram comparam até acabar
+    # o texto, sem chegar a uma ocorrência
+    for i in range(len(sobra)):
+        comparacoes += len(sobra) - i
+    return posicoes, comparacoes
+
+# Busca com autômato em fluxo: o estado é mantido entre os blocos.
+# Retorna (índices do último byte de cada ocorrência, comparações, estado final)
+def buscaAutomatoFluxo(tabela, blocos, finais, estado=0):
+    fins = []
+    n = 0
+    for bloco in blocos:
+        achados, estado = executaBloco(tabela, bloco, finais, estado, n)
+        fins.extend(achados)
+        n += len(bloco)
+    return fins, n, estado
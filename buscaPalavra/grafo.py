@@ -0,0 +1,55 @@
+# Desenho do autômato no navegador (networkx + pyvis). As bibliotecas só
+# são importadas aqui, então a busca não depende delas.
+
+import os
+
+# Agrupa as transições em arestas (origem, destino, rótulo), juntando em um
+# só rótulo as letras que ligam os mesmos dois estados.
+# modo='completo': todas as (m+1)·|Σ| transições
+# modo='podado': só as arestas para frente e as de volta que não vão para
+# s0; todas as que voltam para s0 viram uma única aresta "outros" por estado
+def arestasGrafo(estados, transicoes, modo='podado'):
+    posicao = {estado: k for k, estado in enumerate(estados)}
+    letras = {}
+    for origem, letra, destino in transicoes:
+        if modo == 'podado' and destino == estados[0] and posicao[origem] + 1 != posicao[destino]:
+            letras.setdefault((origem, destino), None)
+            continue
+        rotulo = letras.setdefault((origem, destino), [])
+        if rotulo is not None:
+            rotulo.append(letra)
+    return [(origem, destino, 'outros' if rotulo is None else ','.join(rotulo))
+            for (origem, destino), rotulo in letras.items()]
+
+# Gera o HTML do grafo, a não ser que o arquivo já tenha sido gerado para o
+# mesmo autômato (mesma chave) e no mesmo modo. A chave fica em um arquivo
+# ao lado do HTML. Retorna True se o HTML foi gerado de novo
+def desenhaGrafo(estados, transicoes, chave, arquivo='G.html', modo='podado'):
+    marca = arquivo + '.chave'
+    assinatura = chave + ':' + modo
+    if os.path.exists(arquivo) and os.path.exists(marca):
+        with open(marca) as f:
+            if f.read().strip() == assinatura:
+                return False
+
+    import networkx as nx
+    from pyvis.network import Network
+
+    # Cria um grafo vazio
+    G = nx.DiGraph()
+
+    # Coloca os vértices no grafo G
+    G.add_nodes_from(estados)
+
+    # Colocar as arestas no grafo G
+    for origem, destino, rotulo in arestasGrafo(estados, transicoes, modo):
+        G.add_edge(origem, destino, label=rotulo)
+
+    # Visualizando o grafo usando networkx e pyvis
+    nt = Network('500px', '800px', directed=True)
+    nt.from_nx(G)
+    nt.show(arquivo, True)
+
+    with open(marca, 'w') as f:
+        f.write(assinatura)
+    return True
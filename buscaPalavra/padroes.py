@@ -0,0 +1,223 @@
+# Compilador de padrões com curingas e classes de caracteres para o
+# autômato de busca. Sintaxe (no estilo dos curingas do terminal):
+#   ?       qualquer byte
+#   *       o item anterior repetido zero ou mais vezes (como em
+#           expressões regulares: "ba*" é b, ba, baa...; "?*" é qualquer
+#           sequência)
+#   [abc]   um byte da classe; aceita intervalos como [a-z]
+#   [^ab]   (ou [!ab]) um byte fora da classe
+#   \x      o caractere x literal
+# O padrão vira um AFN, que é determinizado pela construção de subconjuntos
+# e minimizado. O resultado é a mesma tabela (estados x 256 bytes) usada
+# pelo executaBloco, então a busca continua sendo uma única passada linear.
+# Como '*' deixa as ocorrências com tamanhos diferentes, a busca informa o
+# índice do último byte de cada ocorrência. Itens com '*' no fim do padrão
+# são descartados: eles sempre aceitam a repetição vazia, então só fariam
+# cada byte seguinte contar como mais uma ocorrência. Assim cada ocorrência
+# é informada uma vez, no fim da sua versão mais curta.
+
+from automato import OUTRO
+
+TODOS = frozenset(range(256))
+
+# Mude quando o significado da sintaxe mudar (entra na chave do cache)
+VERSAO_SINTAXE = 2
+
+
+def leClasse(padrao, i):
+    # padrao[i] é o '['; retorna (conjunto de bytes, índice depois do ']')
+    i += 1
+    negada = i < len(padrao) and padrao[i] in '^!'
+    if negada:
+        i += 1
+    bytes_classe = set()
+    primeiro = True
+    while i < len(padrao) and (padrao[i] != ']' or primeiro):
+        letra = padrao[i]
+        if letra == '\\' and i + 1 < len(padrao):
+            i += 1
+            letra = padrao[i]
+        if i + 2 < len(padrao) and padrao[i + 1] == '-' and padrao[i + 2] != ']':
+            fim = padrao[i + 2]
+            bytes_classe.update(range(codigoByte(letra), codigoByte(fim) + 1))
+            i += 3
+        else:
+            bytes_classe.add(codigoByte(letra))
+            i += 1
+        primeiro = False
+    if i >= len(padrao):
+        raise ValueError("Classe de caracteres sem ']' no padrão")
+    return (TODOS - bytes_classe) if negada else frozenset(bytes_classe), i + 1
+
+
+def codigoByte(letra):
+    codigo = letra.encode('utf-8')
+    if len(codigo) != 1:
+        raise ValueError(f"Classes de caracteres só aceitam caracteres de um byte: {letra!r}")
+    return codigo[0]
+
+
+# Quebra o padrão em uma lista de itens [sequência, repete]: a sequência
+# tem um conjunto de bytes por posição (um caractere literal de vários
+# bytes em UTF-8 ocupa várias posições) e repete indica um '*' depois dele
+def lePadrao(padrao):
+    itens = []
+    i = 0
+    while i < len(padrao):
+        letra = padrao[i]
+        if letra == '*':
+            if not itens:
+                raise ValueError("'*' sem um item antes para repetir no padrão")
+            itens[-1][1] = True
+            i += 1
+        elif letra == '?':
+            itens.append([[TODOS], False])
+            i += 1
+        elif letra == '[':
+            classe, i = leClasse(padrao, i)
+            itens.append([[classe], False])
+        else:
+            if letra == '\\' and i + 1 < len(padrao):
+                i += 1
+                letra = padrao[i]
+            itens.append([[frozenset([byte]) for byte in letra.encode('utf-8')], False])
+            i += 1
+    while itens and itens[-1][1]:
+        itens.pop()
+    if not itens:
+        raise ValueError("O padrão precisa de pelo menos um item sem '*'")
+    return itens
+
+
+# AFN com um estado por posição dos itens. O estado 0 tem um laço com
+# todos os bytes (a ocorrência pode começar em qualquer lugar do texto).
+# Um item com '*' ganha estados próprios de entrada e saída, ligados por
+# transições vazias: pular o item, ou voltar ao começo dele depois de lido.
+# Retorna (transicoes[estado] = [(bytes, destino)], vazias[estado], final)
+def criaAFN(itens):
+    transicoes = [[]]
+    vazias = [[]]
+
+    def novoEstado():
+        transicoes.append([])
+        vazias.append([])
+        return len(transicoes) - 1
+
+    transicoes[0].append((TODOS, 0))
+    estado = 0
+    for sequencia, repete in itens:
+        if repete:
+            entrada = novoEstado()
+            vazias[estado].append(entrada)
+            estado = entrada
+        inicio = estado
+        for bytes_item in sequencia:
+            proximo = novoEstado()
+            transicoes[estado].append((bytes_item, proximo))
+            estado = proximo
+        if repete:
+            saida = novoEstado()
+            vazias[inicio].append(saida)
+            vazias[estado].extend([inicio, saida])
+            estado = saida
+    return transicoes, vazias, estado
+
+
+def fechoVazio(estados, vazias):
+    pilha = list(estados)
+    fecho = set(estados)
+    while pilha:
+        for destino in vazias[pilha.pop()]:
+            if destino not in fecho:
+                fecho.add(destino)
+                pilha.append(destino)
+    return frozenset(fecho)
+
+
+# Construção de subconjuntos. Os bytes que o padrão não distingue formam
+# uma única classe, então cada subconjunto é calculado uma vez por classe
+# e não 256 vezes
+def determiniza(transicoes, vazias, final):
+    classes = classesDeBytes(transicoes)
+    inicial = fechoVazio([0], vazias)
+    indice = {inicial: 0}
+    fila = [inicial]
+    tabela = []
+    while len(tabela) < len(fila):
+        atual = fila[len(tabela)]
+        linha = [0] * 256
+        for classe in classes:
+            byte = classe[0]
+            destinos = {destino for estado in atual
+                        for bytes_item, destino in transicoes[estado] if byte in bytes_item}
+            proximo = fechoVazio(destinos, vazias)
+            if proximo not in indice:
+                indice[proximo] = len(fila)
+                fila.append(proximo)
+            for byte in classe:
+                linha[byte] = indice[proximo]
+        tabela.append(linha)
+    finais = {k for k, conjunto in enumerate(fila) if final in conjunto}
+    return tabela, finais
+
+
+# Agrupa os bytes que aparecem exatamente nos mesmos itens do padrão
+def classesDeBytes(transicoes):
+    conjuntos = [bytes_item for saidas in transicoes for bytes_item, _ in saidas]
+    grupos = {}
+    for byte in range(256):
+        assinatura = tuple(byte in conjunto for conjunto in conjuntos)
+        grupos.setdefault(assinatura, []).append(byte)
+    return list(grupos.values())
+
+
+# Minimização por refinamento de partições (algoritmo de Moore): começa
+# separando finais e não finais e divide os blocos até que estados do
+# mesmo bloco tenham transições para os mesmos blocos
+def minimiza(tabela, finais):
+    bloco = [1 if estado in finais else 0 for estado in range(len(tabela))]
+    while True:
+        assinaturas = {}
+        novo = []
+        for estado, linha in enumerate(tabela):
+            assinatura = (bloco[estado], tuple(bloco[destino] for destino in linha))
+            novo.append(assinaturas.setdefault(assinatura, len(assinaturas)))
+        if len(assinaturas) == len(set(bloco)):
+            break
+        bloco = novo
+    # Renumera para que o estado inicial continue sendo o 0
+    ordem = {}
+    for estado in range(len(tabela)):
+        ordem.setdefault(bloco[estado], len(ordem))
+    minima = [None] * len(ordem)
+    for estado, linha in enumerate(tabela):
+        if minima[ordem[bloco[estado]]] is None:
+            minima[ordem[bloco[estado]]] = [ordem[bloco[destino]] for destino in linha]
+    return minima, {ordem[bloco[estado]] for estado in finais}
+
+
+# Compila o padrão: retorna (tabela como lista de listas, estados finais)
+def compilaPadrao(padrao):
+    tabela, finais = determiniza(*criaAFN(lePadrao(padrao)))
+    return minimiza(tabela, finais)
+
+
+# Alfabeto para mostrar o autômato: os caracteres citados no padrão mais
+# a classe OUTRO (qualquer outro byte, que o autômato trata do mesmo jeito)
+def alfabetoPadrao(padrao):
+    citados = sorted(set().union(*(bytes_item for sequencia, _ in lePadrao(padrao)
+                                   for bytes_item in sequencia if bytes_item != TODOS)))
+    return [chr(byte) for byte in citados] + [OUTRO]
+
+
+# Transições [estado, letra, estado] da tabela, para mostrar e desenhar
+def transicoesPadrao(tabela, alfabeto):
+    citados = {ord(letra) for letra in alfabeto if letra != OUTRO}
+    outro = next((byte for byte in range(256) if byte not in citados), None)
+    transicoes = []
+    for estado, linha in enumerate(tabela):
+        for letra in alfabeto:
+            byte = outro if letra == OUTRO else ord(letra)
+            if byte is not None:
+                transicoes.append(['s'+str(estado), letra, 's'+str(linha[byte])])
+    return transicoes
@@ -0,0 +1,93 @@
+# Execução especulativa e paralela do autômato: o arquivo é cortado em
+# trechos e cada processo simula o seu trecho a partir de TODOS os estados
+# possíveis (já que ele não sabe em que estado o trecho anterior termina).
+# Depois os trechos são costurados em ordem, encadeando o estado final de
+# cada um como estado inicial do próximo.
+#
+# As simulações a partir de estados diferentes andam juntas e se fundem
+# quando chegam no mesmo estado. No autômato KMP o estado só depende das
+# últimas m letras lidas, então depois de no máximo m bytes sobra uma
+# única simulação e o custo extra fica limitado a um aquecimento curto.
+
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from automato import executaBloco
+
+# Tabela e estados finais ficam em variáveis globais de cada processo,
+# para não serem enviados de novo a cada trecho
+tabela_processo = None
+finais_processo = None
+
+
+def iniciaProcesso(tabela, finais):
+    global tabela_processo, finais_processo
+    tabela_processo = tabela
+    finais_processo = finais
+
+
+# Simula 'dados' a partir de todos os estados ao mesmo tempo. Retorna:
+# - fim_de[s]: estado ao fim do trecho começando em s
+# - antes[s]: ocorrências (índice do último byte) antes das simulações se fundirem
+# - comuns: ocorrências depois que sobrou uma única simulação
+def simulaTodosEstados(tabela, dados, finais, total_estados):
+    # grupos: estado atual -> estados iniciais que chegaram nele
+    grupos = {estado: [estado] for estado in range(total_estados)}
+    antes = {estado: [] for estado in range(total_estados)}
+    i = 0
+    while len(grupos) > 1 and i < len(dados):
+        byte = dados[i]
+        novos = {}
+        for atual, inicios in grupos.items():
+            proximo = tabela[atual][byte]
+            if proximo in finais:
+                for inicio in inicios:
+                    antes[inicio].append(i)
+            novos.setdefault(proximo, []).extend(inicios)
+        grupos = novos
+        i += 1
+
+    if len(grupos) == 1:
+        (atual, _), = grupos.items()
+        comuns, final = executaBloco(tabela, dados[i:], finais, atual, i)
+        fim_de = {estado: final for estado in range(total_estados)}
+    else:
+        comuns = []
+        fim_de = {inicio: atual for atual, inicios in grupos.items() for inicio in inicios}
+    return fim_de, antes, comuns
+
+
+# Lê o trecho [inicio, fim) do arquivo (mapeado em memória) e simula
+def processaTrecho(tarefa):
+    caminho, inicio, fim, total_estados = tarefa
+    with open(caminho, "rb") as arquivo:
+        with mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+            dados = mapa[inicio:fim].replace(b'\n', b'')
+    fim_de, antes, comuns = simulaTodosEstados(tabela_processo, dados, finais_processo, total_estados)
+    return fim_de, antes, comuns, len(dados)
+
+
+# Busca paralela no arquivo. Retorna o mesmo que buscaAutomatoFluxo:
+# (índices do último byte de cada ocorrência, comparações, estado final),
+# com posições contadas na cadeia sem '\n', idênticas às da busca sequencial.
+# A tabela precisa estar no formato de lista de listas.
+def buscaAutomatoParalela(tabela, caminho, finais, estado=0, processos=None, tamanho_trecho=16 << 20):
+    processos = processos or os.cpu_count() or 1
+    tamanho = os.path.getsize(caminho)
+    if tamanho == 0:
+        return [], 0, estado
+    tamanho_trecho = min(tamanho_trecho, -(-tamanho // processos))
+    tarefas = [(caminho, inicio, min(inicio + tamanho_trecho, tamanho), len(tabela))
+               for inicio in range(0, tamanho, tamanho_trecho)]
+
+    fins = []
+    n = 0
+    with ProcessPoolExecutor(processos, initializer=iniciaProcesso, initargs=(tabela, finais)) as executor:
+        # map devolve os trechos em ordem, então a costura é feita na sequência
+        for fim_de, antes, comuns, tamanho_dados in executor.map(processaTrecho, tarefas):
+            fins.extend(n + fim for fim in antes[estado])
+            fins.extend(n + fim for fim in comuns)
+            estado = fim_de[estado]
+            n += tamanho_dados
+    return fins, n, estado